@@ -0,0 +1,112 @@
+import pygame
+import numpy as np
+from settings import *
+
+# names of the values computed for every enemy at once
+STATUSES = ("idle", "move", "attack")
+TIERS = ("full", "reduced", "sleeping")
+
+
+class EnemyScheduler(pygame.sprite.Group):
+    # group containing every enemy, it decides which enemies are updated on each frame (level of detail) :
+    # - full : close enough to notice the player or to be on screen, updated every frame
+    # - reduced : further away, updated once every AI_SLICES steps (a different slice of them on each step),
+    #   with a step AI_SLICES times longer so they still move at their speed
+    # - sleeping : far away, not updated at all (no animation, no movement)
+    # it also computes what every enemy perceives of the player (distance, direction, status) in one go with numpy
+    def __init__(self):
+        super().__init__()
+
+        # enemy -> slice in which it is updated when it's in the reduced tier
+        self.slices = {}
+        self.next_slice = 0
+        self.frame_count = 0
+
+        # number of enemies that have been updated in each tier on the last frame (and the ones sleeping)
+        self.counts = {"full": 0, "reduced": 0, "sleeping": 0}
+
+        # enemies in the same order as the arrays, rebuilt when an enemy joins or leaves the group
+        self.enemies = []
+        self.arrays_outdated = True
+
+    # * overwriting the methods used by pygame when a sprite joins or leaves a group
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        # spread the enemies between the slices
+        self.slices[sprite] = self.next_slice
+        self.next_slice = (self.next_slice + 1) % AI_SLICES
+        self.arrays_outdated = True
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        self.slices.pop(sprite, None)
+        self.arrays_outdated = True
+
+    def build_arrays(self):
+        # the radiuses never change, so they're only read when the enemies change
+        self.enemies = self.sprites()
+        self.attack_radiuses = np.array([enemy.attack_radius for enemy in self.enemies], dtype=float)
+        self.notice_radiuses = np.array([enemy.notice_radius for enemy in self.enemies], dtype=float)
+        self.full_distances = np.maximum(self.notice_radiuses, AI_FULL_DISTANCE)
+        self.arrays_outdated = False
+
+    def perceive(self, player):
+        # compute the distance, direction and status of every enemy with a few operations on arrays
+        if self.arrays_outdated:
+            self.build_arrays()
+        if not self.enemies:
+            return
+
+        centers = np.array([enemy.rect.center for enemy in self.enemies], dtype=float)
+        can_attack = np.array([enemy.can_attack for enemy in self.enemies], dtype=bool)
+
+        # vector from every enemy to the player, its length, and the normalized vector (0, 0 if they're on each other)
+        differences = np.array(player.rect.center, dtype=float) - centers
+        distances = np.hypot(differences[:, 0], differences[:, 1])
+        directions = differences / np.where(distances > 0, distances, 1)[:, None]
+
+        # attack if it's close enough and can attack, move if it notices the player, idle otherwise
+        statuses = np.where((distances <= self.attack_radiuses) & can_attack, 2,
+                            np.where(distances <= self.notice_radiuses, 1, 0))
+        # tier used on the next frame
+        tiers = np.where(distances <= self.full_distances, 0, np.where(distances <= AI_SLEEP_DISTANCE, 1, 2))
+
+        for enemy, distance, direction, status, tier in zip(self.enemies, distances.tolist(), directions.tolist(),
+                                                             statuses.tolist(), tiers.tolist()):
+            enemy.player_distance = distance
+            enemy.player_direction = direction
+            enemy.player_status = STATUSES[status]
+            enemy.ai_tier = TIERS[tier]
+
+    def update(self, player, delta_time):
+        self.frame_count += 1
+        current_slice = self.frame_count % AI_SLICES
+        self.counts = {"full": 0, "reduced": 0, "sleeping": 0}
+
+        # find the enemies that are updated on this step (with the tier computed on the last step)
+        # and how much time has passed for them since their last update
+        active_enemies = []
+        enemy_delta_times = []
+        for enemy in self.sprites():
+            tier = enemy.ai_tier
+            if tier == "full":
+                active_enemies.append(enemy)
+                enemy_delta_times.append(delta_time)
+                self.counts[tier] += 1
+            elif tier == "reduced" and self.slices[enemy] == current_slice:
+                active_enemies.append(enemy)
+                enemy_delta_times.append(delta_time * AI_SLICES)
+                self.counts[tier] += 1
+            elif tier == "sleeping":
+                self.counts["sleeping"] += 1
+
+        # move and animate them
+        for enemy, enemy_delta_time in zip(active_enemies, enemy_delta_times):
+            enemy.update(enemy_delta_time)
+
+        # see where the player is from every enemy (after they moved)
+        self.perceive(player)
+
+        # then update their status (attack, death)
+        for enemy in active_enemies:
+            enemy.enemy_update(player)
@@ -0,0 +1,242 @@
+import os
+import json
+import random
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+from time import perf_counter
+
+# the benchmark never opens a window or plays a sound (the drivers must be chosen before pygame starts)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+import numpy as np
+from settings import *
+from support import import_map
+from level import Level
+
+# tool : run scripted scenarios of the game without a window and measure each phase of the frames
+# run it from the code folder : python benchmark.py [--frames 600] [--scenario fight] [--output results.json]
+# the results are written (by default) in BENCHMARK_FOLDER, in a file named after the current commit
+
+BENCHMARK_FOLDER = "../benchmarks"
+# frames run before measuring (the chunks around the player are loaded, the caches are filled...)
+WARMUP_FRAMES = 60
+# numbers of the monsters in the entity layer of the map
+MONSTER_IDS = [390, 391, 392, 393]
+
+
+class ScriptedKeys:
+    # replaces the result of pygame.key.get_pressed : the keys pressed are chosen by the scenario
+    def __init__(self):
+        self.pressed = set()
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+def find_free_cell(game_map, found):
+    # the free cell (where the player can stand) with the most found cells around it (in a screen)
+    found = found.astype(np.int32)
+
+    # number of cells found in the screen around every cell (with the sums of every rectangle from the top left)
+    half_columns, half_rows = WIDTH // TILESIZE // 2, HEIGTH // TILESIZE // 2
+    sums = np.pad(found.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+    rows, columns = found.shape
+    row_indexes = np.arange(rows)[:, None]
+    column_indexes = np.arange(columns)[None, :]
+    top, bottom = np.clip(row_indexes - half_rows, 0, rows), np.clip(row_indexes + half_rows + 1, 0, rows)
+    left, right = np.clip(column_indexes - half_columns, 0, columns), np.clip(column_indexes + half_columns + 1, 0, columns)
+    counts = sums[bottom, right] - sums[top, right] - sums[bottom, left] + sums[top, left]
+
+    # the player can't stand on an obstacle
+    free = (game_map["boundary"] == -1) & (game_map["grass"] == -1) & (game_map["object"] == -1)
+    counts[~free] = -1
+    row, column = np.unravel_index(np.argmax(counts), counts.shape)
+    return int(column), int(row)
+
+
+def move_player(level, cell):
+    # place the player in the middle of the cell and load the world around it
+    level.player.hitbox.center = (cell[0] * TILESIZE + TILESIZE // 2, cell[1] * TILESIZE + TILESIZE // 2)
+    level.player.rect.center = level.player.hitbox.center
+    level.world.load_around(level.player.rect.center)
+
+
+# * SCENARIOS
+# each scenario places the player (setup) and chooses the keys pressed on each frame (keys)
+
+def setup_grass(level, game_map):
+    move_player(level, find_free_cell(game_map, game_map["grass"] != -1))
+
+def keys_idle(level, frame):
+    return set()
+
+def setup_walk(level, game_map):
+    pass
+
+def keys_walk(level, frame):
+    # walk in a big square, changing direction every 4 seconds
+    directions = (pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP)
+    return {directions[(frame // (4 * TICK_RATE)) % len(directions)]}
+
+def setup_fight(level, game_map):
+    move_player(level, find_free_cell(game_map, np.isin(game_map["entity"], MONSTER_IDS)))
+
+def keys_fight(level, frame):
+    # attack with the weapon as soon as possible, turning around from time to time
+    directions = (pygame.K_RIGHT, pygame.K_DOWN, pygame.K_LEFT, pygame.K_UP)
+    keys = {pygame.K_SPACE}
+    if frame % TICK_RATE == 0:
+        keys.add(directions[(frame // TICK_RATE) % len(directions)])
+    return keys
+
+def setup_flame(level, game_map):
+    move_player(level, find_free_cell(game_map, np.isin(game_map["entity"], MONSTER_IDS)))
+    # the first magic is the flame
+    level.player.magic_index = 0
+
+def keys_flame(level, frame):
+    # cast the flame as soon as possible, the energy never runs out
+    level.player.energy = level.player.stats["energy"]
+    return {pygame.K_LCTRL}
+
+def setup_menu(level, game_map):
+    level.toggle_upgrade_menu()
+
+def keys_menu(level, frame):
+    # move the selection in the upgrade menu every half second of the game, back and forth between the items
+    # (the menu waits for its cooldown in real time, and the frames run much faster than that : it's skipped)
+    if frame % (TICK_RATE // 2):
+        return set()
+    upgrade = level.upgrade
+    upgrade.can_select = True
+    moves = upgrade.attribute_number - 1
+    return {pygame.K_RIGHT} if (frame // (TICK_RATE // 2)) % (2 * moves) < moves else {pygame.K_LEFT}
+
+scenarios = {
+    "idle_grass": (setup_grass, keys_idle),
+    "walk": (setup_walk, keys_walk),
+    "fight": (setup_fight, keys_fight),
+    "flame": (setup_flame, keys_flame),
+    "menu": (setup_menu, keys_menu)
+}
+
+
+def get_commit():
+    # commit the benchmark is run on (to compare the results between commits)
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+        changed = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True,
+                                 text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, bool(changed)
+
+
+def summarize(times):
+    # mean, 95th and 99th percentiles of a list of times (in milliseconds)
+    milliseconds = np.array(times) * 1000
+    return {"mean": round(float(milliseconds.mean()), 4),
+            "p95": round(float(np.percentile(milliseconds, 95)), 4),
+            "p99": round(float(np.percentile(milliseconds, 99)), 4),
+            "frames": len(milliseconds)}
+
+
+def run_scenario(name, frames, seed):
+    # every scenario starts from a new level, with the same random numbers
+    setup, get_keys = scenarios[name]
+    random.seed(seed)
+    level = Level()
+    game_map = import_map()
+    setup(level, game_map)
+
+    screen = pygame.display.get_surface()
+    keys = ScriptedKeys()
+    get_pressed = pygame.key.get_pressed
+    pygame.key.get_pressed = lambda: keys
+
+    # phase name -> time of every measured frame
+    phase_times = {"frame": []}
+    try:
+        for frame in range(WARMUP_FRAMES + frames):
+            keys.pressed = get_keys(level, frame)
+
+            start = perf_counter()
+            pygame.event.pump()
+            # same as the game : the paused level draws over the last frame, only the changes are updated
+            if not level.game_paused:
+                screen.fill(WATER_COLOR)
+            level.run(TICK_TIME)
+            if level.dirty_rects is None:
+                pygame.display.update()
+            else:
+                pygame.display.update(level.dirty_rects)
+            frame_time = perf_counter() - start
+
+            if frame >= WARMUP_FRAMES:
+                phase_times["frame"].append(frame_time)
+                for phase, time in level.phase_times.items():
+                    phase_times.setdefault(phase, []).append(time)
+    finally:
+        pygame.key.get_pressed = get_pressed
+        level.world.close()
+
+    return {phase: summarize(times) for phase, times in phase_times.items()}
+
+
+def run_benchmark(names, frames, seed):
+    pygame.init()
+    pygame.display.set_mode((WIDTH, HEIGTH))
+
+    commit, changed = get_commit()
+    results = {
+        "commit": commit,
+        # the working tree had changes that aren't committed
+        "dirty": changed,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "frames": frames,
+        "warmup_frames": WARMUP_FRAMES,
+        "seed": seed,
+        "scenarios": {}
+    }
+    for name in names:
+        results["scenarios"][name] = run_scenario(name, frames, seed)
+        print_scenario(name, results["scenarios"][name])
+
+    pygame.quit()
+    return results
+
+
+def print_scenario(name, phases):
+    print(f"{name}")
+    for phase, stats in phases.items():
+        print(f"    {phase:<14} mean {stats['mean']:8.3f} ms   p95 {stats['p95']:8.3f} ms   p99 {stats['p99']:8.3f} ms")
+
+
+def get_arguments():
+    parser = argparse.ArgumentParser(description="benchmark of scripted scenarios of the game")
+    parser.add_argument("--frames", type=int, default=600, help="number of frames measured in each scenario")
+    parser.add_argument("--scenario", action="append", choices=list(scenarios.keys()),
+                        help="scenario to run (can be given several times, every scenario by default)")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random generator")
+    parser.add_argument("--output", default=None, help="json file where the results are written")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    arguments = get_arguments()
+    results = run_benchmark(arguments.scenario or list(scenarios.keys()), arguments.frames, arguments.seed)
+
+    output = arguments.output
+    if output is None:
+        os.makedirs(BENCHMARK_FOLDER, exist_ok=True)
+        output = f"{BENCHMARK_FOLDER}/{(results['commit'] or 'unknown')[:10]}{'-dirty' if results['dirty'] else ''}.json"
+    with open(output, "w") as output_file:
+        json.dump(results, output_file, indent=4)
+    print(f"results written in {output}")
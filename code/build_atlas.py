@@ -0,0 +1,100 @@
+import json
+import os
+import pygame
+from settings import *
+
+# build step : pack every image of the graphics folder into a few atlases and write the manifest
+# the game reads the manifest (through support.py) and cuts the images out of the atlases
+# run it from the code folder, like the game : python build_atlas.py
+
+# empty space between two images
+PADDING = 1
+
+
+def find_images():
+    # get every image of the graphics folder (as a path relative to it), in a fixed order
+    images = []
+    for folder, subfolders, files in os.walk(GRAPHICS_FOLDER):
+        relative_folder = os.path.relpath(folder, GRAPHICS_FOLDER).replace(os.sep, "/")
+        if relative_folder.split("/")[0] in ATLAS_EXCLUDED:
+            continue
+
+        for file in sorted(files):
+            if file.lower().endswith(".png"):
+                images.append(file if relative_folder == "." else relative_folder + "/" + file)
+
+    return sorted(images)
+
+
+def pack(sizes):
+    # place every rectangle on shelves : rows as high as their tallest image, filled from left to right
+    # the tallest images are placed first, a new atlas is started when one is full
+    # returns name -> (atlas index, rect)
+    placements = {}
+    atlas_index = 0
+    x = y = shelf_height = 0
+
+    for name, (width, height) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if width + PADDING > ATLAS_SIZE or height + PADDING > ATLAS_SIZE:
+            raise ValueError(f"{name} is bigger than the atlas ({ATLAS_SIZE}x{ATLAS_SIZE})")
+
+        # go to the next shelf if the image doesn't fit on this one
+        if x + width + PADDING > ATLAS_SIZE:
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+
+        # go to the next atlas if the shelf doesn't fit in this one
+        if y + height + PADDING > ATLAS_SIZE:
+            atlas_index += 1
+            x = y = shelf_height = 0
+
+        placements[name] = (atlas_index, pygame.Rect(x, y, width, height))
+        x += width + PADDING
+        shelf_height = max(shelf_height, height + PADDING)
+
+    return placements
+
+
+def build_atlas():
+    images = {name: pygame.image.load(GRAPHICS_FOLDER + "/" + name) for name in find_images()}
+    placements = pack({name: image.get_size() for name, image in images.items()})
+
+    # size of each atlas, cropped to what is used
+    atlas_sizes = {}
+    for atlas_index, rect in placements.values():
+        width, height = atlas_sizes.get(atlas_index, (0, 0))
+        atlas_sizes[atlas_index] = (max(width, rect.right), max(height, rect.bottom))
+
+    # draw the images on the atlases
+    atlases = [pygame.Surface(atlas_sizes[index], pygame.SRCALPHA) for index in range(len(atlas_sizes))]
+    for name, (atlas_index, rect) in placements.items():
+        # adding to a fully transparent surface copies the pixels as they are (a normal blit would blend them)
+        atlases[atlas_index].blit(images[name], rect, special_flags=pygame.BLEND_RGBA_ADD)
+
+    os.makedirs(ATLAS_FOLDER, exist_ok=True)
+    atlas_files = []
+    for index, atlas in enumerate(atlases):
+        atlas_files.append(f"atlas_{index}.png")
+        pygame.image.save(atlas, ATLAS_FOLDER + "/" + atlas_files[-1])
+
+    # folder -> its images, in order (that's what import_folder gives)
+    folders = {}
+    for name in images.keys():
+        folder = name.rsplit("/", 1)[0] if "/" in name else "."
+        folders.setdefault(folder, []).append(name)
+
+    manifest = {
+        "atlases": atlas_files,
+        "images": {name: [atlas_index, rect.x, rect.y, rect.width, rect.height]
+                   for name, (atlas_index, rect) in sorted(placements.items())},
+        "folders": folders
+    }
+    with open(ATLAS_MANIFEST, "w") as manifest_file:
+        json.dump(manifest, manifest_file)
+
+    print(f"packed {len(images)} images into {len(atlases)} atlases")
+
+
+if __name__ == '__main__':
+    build_atlas()
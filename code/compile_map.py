@@ -0,0 +1,18 @@
+import numpy as np
+from settings import *
+from support import import_csv_layout, save_compiled_map
+
+# build step : compile the csv layers of the map (map_layers in settings) into MAP_FILE
+# run it from the code folder after editing the map : python compile_map.py
+
+
+def compile_map():
+    layers = {name: np.array(import_csv_layout(path), dtype=np.int16) for name, path in map_layers.items()}
+    save_compiled_map(MAP_FILE, layers)
+
+    rows, columns = next(iter(layers.values())).shape
+    print(f"compiled {len(layers)} layers of {columns}x{rows} tiles into {MAP_FILE}")
+
+
+if __name__ == '__main__':
+    compile_map()
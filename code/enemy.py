@@ -2,6 +2,8 @@ import pygame
 from settings import *
 from entity import Entity
 from support import *
+from sounds import get_sound
+import game_time
 
 
 class Enemy(Entity):
@@ -46,6 +48,13 @@ class Enemy(Entity):
         # particle to use after attack
         self.attack_type = monster_info["attack_type"]
 
+        # * perception of the player (computed by the enemy scheduler)
+        self.player_distance = 0
+        self.player_direction = (0, 0)
+        self.player_status = "idle"
+        # level of detail : an enemy is updated every frame until the scheduler has seen it
+        self.ai_tier = "full"
+
         # * player interaction
         self.can_attack = True
         self.attack_cooldown = 1000
@@ -63,13 +72,10 @@ class Enemy(Entity):
         # add xp of player
         self.add_exp = add_xp
 
-        # sounds
-        self.death_sound = pygame.mixer.Sound("../audio/death.wav")
-        self.hit_sound = pygame.mixer.Sound("../audio/hit.wav")
-        self.attack_sound = pygame.mixer.Sound(monster_info["attack_sound"])
-        self.death_sound.set_volume(0.2)
-        self.hit_sound.set_volume(0.2)
-        self.attack_sound.set_volume(0.3)
+        # sounds (shared by every enemy)
+        self.death_sound = get_sound("death")
+        self.hit_sound = get_sound("hit")
+        self.attack_sound = get_sound(monster_info["attack_sound"])
 
     def import_graphics(self,name):
         # almost the same as import_player_assets from player
@@ -79,60 +85,42 @@ class Enemy(Entity):
         # path to the animation of the enemy
         main_path = f"../graphics/monsters/{name}/"
 
-        # load the animations
+        # load the animations, and the hidden version of every frame (shown when flickering)
+        self.hidden_animations = {}
         for animation in self.animations.keys():
             fullpath = main_path + animation
             # eg : graphics/monster/racoon/idle
             self.animations[animation] = import_folder(fullpath)
-
-    def get_player_distance_direction(self,player):
-        # convert the center of the entities as vectors
-        enemy_vector = pygame.math.Vector2(self.rect.center)
-        player_vector = pygame.math.Vector2(player.rect.center)
-
-        # get the module of the vector which is the difference of the two vectors
-        distance = (player_vector - enemy_vector).magnitude()
-        # get the angle of that vector
-        direction = (player_vector - enemy_vector).normalize() if distance > 0 else pygame.math.Vector2(0, 0)
-
-        return distance, direction
+            self.hidden_animations[animation] = import_hidden_folder(fullpath)
 
     def get_status(self,player):
         # move towards the player if possible
-
-        # get the distance to the player
-        distance = self.get_player_distance_direction(player)[0]
-
-        if distance <= self.attack_radius and self.can_attack:
-            if self.status != "attack":
-                self.frame_index = 0
-            self.status = "attack"
-        elif distance <= self.notice_radius:
-            self.status = "move"
-        else:
-            self.status = "idle"
+        # the status has been computed for every enemy at once by the enemy scheduler (in ai.py)
+        if self.player_status == "attack" and self.status != "attack":
+            self.frame_index = 0
+        self.status = self.player_status
 
     def actions(self, player):
         if self.status == "attack":
             self.damage_player(self.attack_damage, self.attack_type)
-            self.attack_time = pygame.time.get_ticks()
+            self.attack_time = game_time.get_ticks()
             self.attack_sound.play()
         elif self.status == "move":
             # move towards the player if possible
 
             # set the direction in which the enemy should move so that they can attack the player
-            self.direction = self.get_player_distance_direction(player)[1]
+            self.direction = pygame.math.Vector2(self.player_direction)
 
         else:
             # if the enemy does not notice the player, the enemy should stop moving
             self.direction = pygame.math.Vector2()
 
-    def animate(self):
+    def animate(self, delta_time):
         # get all the images for the current animation according to the current status
         animation = self.animations[self.status]
 
         # loop over the frame index to get the image to display
-        self.frame_index += self.animation_speed
+        self.frame_index += self.animation_speed * delta_time
 
         if self.frame_index >= len(animation):
             # go back to the first frame when the loop is complete
@@ -150,15 +138,13 @@ class Enemy(Entity):
         if not self.vulnerable:
             alpha = self.flicker_value()
             # when alpha = 255, the enemy is displayed
-            # when alpha = 0, nothing appears
-            # thus creating a flickering effect
-            self.image.set_alpha(alpha)
-        else:
-            # get back to its state
-            self.image.set_alpha(255)
+            # when alpha = 0, the hidden version of the frame appears (a transparent surface)
+            # thus creating a flickering effect without changing the frames (they are shared)
+            if alpha == 0:
+                self.image = self.hidden_animations[self.status][int(self.frame_index)]
 
     def cooldowns(self):
-        current_time = pygame.time.get_ticks()
+        current_time = game_time.get_ticks()
         if not self.can_attack:
             if current_time - self.attack_time >= self.attack_cooldown:
                 self.can_attack = True
@@ -171,7 +157,7 @@ class Enemy(Entity):
         if self.vulnerable:
             self.hit_sound.play()
             # get the direction in which the enemy has been hit
-            self.direction = self.get_player_distance_direction(player)[1]
+            self.direction = pygame.math.Vector2(self.player_direction)
             if attack_type == "weapon":
                 # lower the health of the enemy
                 self.health -= player.get_full_weapon_damage()
@@ -179,7 +165,7 @@ class Enemy(Entity):
                 # magic damage
                 self.health -= player.get_full_magic_damage()
             self.vulnerable = False
-            self.hit_time = pygame.time.get_ticks()
+            self.hit_time = game_time.get_ticks()
 
     def check_death(self):
         # kill an enemy if its health is null
@@ -195,10 +181,10 @@ class Enemy(Entity):
             # change the direction
             self.direction *= - self.resistance
 
-    def update(self):
+    def update(self, delta_time):
         self.knockback()
-        self.move(self.speed)
-        self.animate()
+        self.move(self.speed, delta_time)
+        self.animate(delta_time)
         self.cooldowns()
 
     def enemy_update(self, player):
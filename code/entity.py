@@ -1,5 +1,6 @@
 import pygame
-from math import sin
+from settings import *
+import game_time
 # contains methods that will be used for both the player and the enemy
 
 
@@ -14,49 +15,67 @@ class Entity(pygame.sprite.Sprite):
         # index of the frame for animation
         self.frame_index = 0
 
-        # speed of the animation
-        self.animation_speed = 0.15
+        # speed of the animation (frames per second)
+        self.animation_speed = 9
 
-    def move(self, speed):
+        # exact position of the hitbox (topleft), with the fractions of pixels the hitbox can't store
+        # (None until the entity moves for the first time)
+        self.position = None
+
+    def move(self, speed, delta_time):
         # normalise the self.direction vector (get it back to 1) if the vector has any length
         if self.direction.magnitude() != 0:
             self.direction = self.direction.normalize()
 
-        # change the hitbox, so that it "moves" and then check for the collisions
-        self.hitbox.x += self.direction.x * speed
+        # the hitbox has been placed somewhere else since the last move (or it's the first move) : start from it
+        if self.position is None or (round(self.position.x), round(self.position.y)) != self.hitbox.topleft:
+            self.position = pygame.math.Vector2(self.hitbox.topleft)
+
+        # move the exact position, put the hitbox there so that it "moves" and then check for the collisions
+        # (the speed is in pixels per second, delta_time is the duration of the step in seconds)
+        # a collision moves the hitbox back : the exact position follows it
+        self.position.x += self.direction.x * speed * delta_time
+        self.hitbox.x = round(self.position.x)
         self.collision("horizontal")
+        if self.hitbox.x != round(self.position.x):
+            self.position.x = self.hitbox.x
 
-        self.hitbox.y += self.direction.y * speed
+        self.position.y += self.direction.y * speed * delta_time
+        self.hitbox.y = round(self.position.y)
         self.collision("vertical")
+        if self.hitbox.y != round(self.position.y):
+            self.position.y = self.hitbox.y
 
         # after checking for collisions, put the rectangle where the hitbox is
         self.rect.center = self.hitbox.center
 
     def collision(self, direction):
+        # only check the obstacles placed around the hitbox instead of every obstacle of the map
+        obstacles = self.obstacle_sprites.get_obstacle_rects(self.hitbox)
+
         # check for a collision of the x axis
         if direction == "horizontal":
-            for sprite in self.obstacle_sprites:
-                if (sprite.hitbox.colliderect(self.hitbox)):
+            for obstacle in obstacles:
+                if (obstacle.colliderect(self.hitbox)):
                     # if the entity is moving to the right, move it to the left side of the obstacle
                     if (self.direction.x > 0):
-                        self.hitbox.right = sprite.hitbox.left
+                        self.hitbox.right = obstacle.left
                     if (self.direction.x < 0):
-                        self.hitbox.left = sprite.hitbox.right
+                        self.hitbox.left = obstacle.right
 
         if direction == "vertical":
             # check for a collision of the y axis
-            for sprite in self.obstacle_sprites:
-                if (sprite.hitbox.colliderect(self.hitbox)):
+            for obstacle in obstacles:
+                if (obstacle.colliderect(self.hitbox)):
                     # if the entity is moving down, move it to the top side of the obstacle
                     if (self.direction.y > 0):
-                        self.hitbox.bottom = sprite.hitbox.top
+                        self.hitbox.bottom = obstacle.top
                     if (self.direction.y < 0):
-                        self.hitbox.top = sprite.hitbox.bottom
+                        self.hitbox.top = obstacle.bottom
 
     def flicker_value(self):
-        # flicker between 255 and 0 using the sin function
-        value = sin(pygame.time.get_ticks())
-        if value >= 0:
+        # flicker between 255 and 0 : shown during FLICKER_INTERVAL milliseconds, then hidden
+        if (game_time.get_ticks() // FLICKER_INTERVAL) % 2 == 0:
             return 255
         else:
             return 0
@@ -0,0 +1,19 @@
+from settings import *
+
+# * SIMULATION CLOCK
+# time of the game in milliseconds : it only moves forward when the level is updated (by fixed steps),
+# so every timer of the game (cooldowns, invincibility, flickering) works the same whatever the frame rate
+# (it doesn't move while the game is paused)
+# the menus still use pygame.time.get_ticks (they work in real time)
+game_time = {"ticks": 0.0}
+
+def get_ticks():
+    # same as pygame.time.get_ticks, but in the time of the game
+    return int(game_time["ticks"])
+
+def advance(delta_time):
+    # move the clock forward (delta_time in seconds)
+    game_time["ticks"] += delta_time * 1000
+
+def reset():
+    game_time["ticks"] = 0.0
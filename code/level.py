@@ -1,4 +1,5 @@
 import pygame
+import numpy as np
 
 from settings import *
 from tile import Tile
@@ -6,12 +7,20 @@ from player import Player
 from debug import debug
 from support import *
 from random import choice, randint
-from weapon import Weapon
+from heapq import merge
+from operator import itemgetter
+from time import perf_counter
+import game_time
+from weapon import Weapon, import_weapon_graphics
 from ui import UI
 from enemy import Enemy
 from particles import AnimationPlayer
 from magic import MagicPlayer
 from upgrade import Upgrade
+from terrain import Terrain
+from world import World
+from ai import EnemyScheduler
+from spatial import SpatialGroup, ObstacleGroup, YSortedStrips
 
 
 class Level:
@@ -21,19 +30,51 @@ class Level:
         # get the display surface from main
         self.display_surface = pygame.display.get_surface()
 
+        # particles (drawn by the camera with the sprites)
+        self.animation_player = AnimationPlayer()
+
         # sprite group setup
-        self.visible_sprites = YSortCameraGroup()
-        self.obstacle_sprites = pygame.sprite.Group()
+        self.visible_sprites = YSortCameraGroup(self.animation_player)
+        # obstacles are stored in a grid, so that an entity only checks the obstacles around it
+        self.obstacle_sprites = ObstacleGroup()
 
         # is the game paused ?
         self.game_paused = False
+        # while the game is paused, the world and the ui are drawn once in this snapshot (None until it's drawn)
+        self.snapshot = None
+        # draw the snapshot again on the next frame (if something has been drawn over it)
+        self.redraw_snapshot = False
+        # exp and stats of the player when the snapshot was taken
+        self.snapshot_state = None
+        # surface multiplied with the snapshot to dim it
+        # (blitting it with the multiply flag is much faster than filling the snapshot with that flag)
+        self.dim_surface = pygame.Surface(self.display_surface.get_size()).convert()
+        self.dim_surface.fill(PAUSE_DIM_COLOR)
+        # parts of the screen that have changed on the last frame (None : the whole screen)
+        self.dirty_rects = None
+
+        # time taken by each phase of the last frame
+        self.phase_times = {}
+
+        # time of the frames that hasn't been simulated yet (less than a step, in seconds)
+        self.accumulator = 0
+        # the time of the game starts with the level
+        game_time.reset()
 
         # attack sprites
         self.current_attack = None
-        # will contain : magic, weapon
+        # will contain : weapon (the flames are particles)
         self.attack_sprites = pygame.sprite.Group()
-        # will contain : anything that can be attacked
-        self.attackable_sprites = pygame.sprite.Group()
+        # * registries of every kind of sprite, so each kind can be handled without going through the others
+        # will contain : every enemy, updated depending on their distance to the player
+        self.enemy_sprites = EnemyScheduler()
+        # will contain : every grass tile (stored in a grid, so that an attack only checks the grass around it)
+        self.grass_sprites = SpatialGroup()
+        # will contain : every object tile
+        self.object_sprites = pygame.sprite.Group()
+
+        # load the weapons once (they are created on every attack)
+        import_weapon_graphics()
 
         # sprite setup
         self.create_map()
@@ -42,74 +83,62 @@ class Level:
         self.ui = UI()
         self.upgrade = Upgrade(self.player)
 
-        # particles
-        self.animation_player = AnimationPlayer()
-
         # magic
         self.magic_player = MagicPlayer(self.animation_player)
 
     def create_map(self):
 
-        # layouts of the map
-        layouts = {
-            "boundary": import_csv_layout("../map/map_FloorBlocks.csv"),
-            "grass": import_csv_layout("../map/map_Grass.csv"),
-            "object": import_csv_layout("../map/map_LargeObjects.csv"),
-            "entity": import_csv_layout("../map/map_Entities.csv")
-        }
+        # layouts of the map (arrays of integers, -1 : nothing)
+        game_map = import_map()
+
+        # the boundary is invisible, so it's only stored as a grid of blocked tiles (no sprites needed)
+        self.obstacle_sprites.set_boundary(game_map["boundary"])
 
-        graphics = {
-            "grass": import_folder("../graphics/Grass"),
+        self.graphics = {
+            "grass": import_folder("../graphics/grass"),
             "object": import_folder("../graphics/objects")
         }
 
-        # .items() returns a set-like object containing keys and values
-        for style, layout in layouts.items():
-
-            # # ** enumerate returns a list containing an index and the object that was passed in
-
-            for row_index, row in enumerate(layout):
-                for col_index, col in enumerate(row):
-                    if col != "-1":
-                        x = col_index * TILESIZE
-                        y = row_index * TILESIZE
-
-                        # add a boundary to the group
-                        if style == "boundary":
-                            Tile((x, y), [self.obstacle_sprites], 'invisible')
-
-                        # add a grass tile with a random image
-                        if style == "grass":
-                            random_image = choice(graphics["grass"])
-                            Tile((x, y), [self.visible_sprites, self.obstacle_sprites, self.attackable_sprites],
-                                 "grass", random_image)
-
-                        # add an object tile
-                        if style == "object":
-                            image = graphics["object"][int(col)]
-                            Tile((x, y), [self.visible_sprites, self.obstacle_sprites], "object", image)
-
-                        # add an entity
-                        if style == "entity":
-                            # place the player :
-                            if col == "394":
-                                # the player "knows" the obstacle sprites but isn't inside of that group
-                                self.player = Player((x, y), [self.visible_sprites], self.obstacle_sprites,
-                                                     self.create_attack, self.destroy_attack, self.create_magic)
-                            else:
-                                # create an enemy with the correct name
-                                if col == "390":
-                                    monster_name = "bamboo"
-                                elif col == "391":
-                                    monster_name = "spirit"
-                                elif col == "392":
-                                    monster_name = "raccoon"
-                                else:
-                                    monster_name = "squid"
-
-                                Enemy(monster_name, (x, y), [self.visible_sprites, self.attackable_sprites],
-                                      self.obstacle_sprites, self.damage_player, self.trigger_death_particles,
-                                      self.add_exp)
+        # place the player (394 in the entity layout)
+        row_index, col_index = np.argwhere(game_map["entity"] == 394)[0]
+        # the player "knows" the obstacle sprites but isn't inside of that group
+        self.player = Player((int(col_index) * TILESIZE, int(row_index) * TILESIZE), [self.visible_sprites],
+                             self.obstacle_sprites, self.create_attack, self.destroy_attack, self.create_magic)
+
+        # the grass, objects and enemies are created by the world, only around the player
+        self.world = World(game_map, self.visible_sprites.terrain, self.create_grass, self.create_object,
+                           self.create_enemy)
+        self.world.load_around(self.player.rect.center)
+
+    def create_grass(self, position, image=None):
+        # add a grass tile with a random image (or the one it had before being unloaded)
+        if image is None:
+            image = choice(self.graphics["grass"])
+        return Tile(position, [self.visible_sprites, self.obstacle_sprites, self.grass_sprites], "grass", image)
+
+    def create_object(self, position, index):
+        # add an object tile
+        image = self.graphics["object"][index]
+        return Tile(position, [self.visible_sprites, self.obstacle_sprites, self.object_sprites], "object", image)
+
+    def create_enemy(self, index, position, health=None):
+        # create an enemy with the correct name
+        if index == 390:
+            monster_name = "bamboo"
+        elif index == 391:
+            monster_name = "spirit"
+        elif index == 392:
+            monster_name = "raccoon"
+        else:
+            monster_name = "squid"
+
+        enemy = Enemy(monster_name, position, [self.visible_sprites, self.enemy_sprites],
+                      self.obstacle_sprites, self.damage_player, self.trigger_death_particles, self.add_exp)
+
+        # an enemy loaded again keeps the health it had
+        if health is not None:
+            enemy.health = health
+        return enemy
 
     def destroy_attack(self):
         # if there's a weapon, destroy it after is has served its purpose
@@ -123,17 +152,21 @@ class Level:
 
     def create_magic(self, style, strength, cost):
         if style == "heal":
-            self.magic_player.heal(self.player, strength, cost, [self.visible_sprites])
+            self.magic_player.heal(self.player, strength, cost)
 
         if style == "flame":
-            self.magic_player.flame(self.player, cost, [self.visible_sprites, self.attack_sprites])
+            self.magic_player.flame(self.player, cost)
 
     def player_attack_logic(self):
-        # check if any attack sprite collide with any attackable sprite
-        if self.attack_sprites:
-            for attack_sprite in self.attack_sprites:
-                # get all the sprites that collide with the current attack_sprite
-                collision_sprites = pygame.sprite.spritecollide(attack_sprite, self.attackable_sprites, False)
+        # check if any attack (weapon or flame) collide with any attackable sprite (grass or enemy)
+        attacks = [(attack_sprite.rect, attack_sprite.sprite_type) for attack_sprite in self.attack_sprites]
+        attacks += [(rect, "magic") for rect in self.animation_player.get_attack_rects()]
+        if attacks:
+            for attack_rect, attack_type in attacks:
+                # get all the sprites that collide with the current attack
+                # (only the grass around the attack is checked)
+                collision_sprites = self.grass_sprites.collide(attack_rect) + \
+                                    [enemy for enemy in self.enemy_sprites if enemy.rect.colliderect(attack_rect)]
                 if collision_sprites:
                     # if there are sprites that collide
                     for target_sprite in collision_sprites:
@@ -143,63 +176,139 @@ class Level:
                             offset = pygame.math.Vector2(0, 55)
                             # spawn grass particles : 3 to 6 particles
                             for particle in range(randint(3, 6)):
-                                self.animation_player.create_grass_particles(pos-offset, [self.visible_sprites])
+                                self.animation_player.create_grass_particles(pos-offset)
                             # destroy grass
                             target_sprite.kill()
                         else:
                             # deal damage based on the stats
-                            target_sprite.get_damage(self.player, attack_sprite.sprite_type)
+                            target_sprite.get_damage(self.player, attack_type)
 
     def damage_player(self, amount, attack_type):
         # remove health from player if hit
         if self.player.vulnerable:
             self.player.health -= amount
             self.player.vulnerable = False
-            self.player.hurt_time = pygame.time.get_ticks()
+            self.player.hurt_time = game_time.get_ticks()
 
             # generate particles
-            self.animation_player.create_particles(attack_type, self.player.rect.center, [self.visible_sprites])
+            self.animation_player.create_particles(attack_type, self.player.rect.center)
 
     def trigger_death_particles(self, pos, particle_type):
         # trigger death particles, will be used by enemy
-        self.animation_player.create_particles(particle_type, pos, [self.visible_sprites])
+        self.animation_player.create_particles(particle_type, pos)
 
     def add_exp(self, amount):
         self.player.exp += amount
 
     def toggle_upgrade_menu(self):
         self.game_paused = not self.game_paused
+        # the snapshot is taken on the next frame, when the game is paused
+        self.snapshot = None
+
+    def end_phase(self, name, start):
+        # add how long a phase of the frame took, and return when it ended (the start of the next phase)
+        end = perf_counter()
+        self.phase_times[name] = self.phase_times.get(name, 0) + end - start
+        return end
+
+    def run(self, frame_time=TICK_TIME):
+        # time taken by each phase of this frame (in seconds), used by the benchmark and the profiler
+        self.phase_times = {}
+
+        # update the game by fixed steps : as many steps as needed to catch up with the time of the frame
+        # (frame_time in seconds, what is left is kept for the next frame)
+        steps = round(frame_time / TICK_TIME)
+        if steps and abs(frame_time - steps * TICK_TIME) < FRAME_SNAP_TIME:
+            frame_time = steps * TICK_TIME
+        self.accumulator = min(self.accumulator + frame_time, TICK_TIME * MAX_STEPS_PER_FRAME)
+        while self.accumulator >= TICK_TIME:
+            self.update(TICK_TIME)
+            self.accumulator -= TICK_TIME
+
+        # then draw the game once
+        self.draw()
+
+    def update(self, delta_time):
+        # update the game by one step of delta_time seconds (nothing moves while the game is paused)
+        if self.game_paused:
+            return
+        time = perf_counter()
+        game_time.advance(delta_time)
 
-    def run(self):
-        # draw all the visible sprites
-        self.visible_sprites.custom_draw(self.player)
+        # load and unload the chunks around the player
+        self.world.update(self.player)
+        time = self.end_phase("world", time)
 
-        # display the data from the player using ui
-        self.ui.display(self.player)
+        # update the player and the particles (the tiles never change)
+        self.player.update(delta_time)
+        self.animation_player.update(delta_time)
+        time = self.end_phase("update", time)
 
-        if self.game_paused:
-            # display the upgrade menu
-            self.upgrade.display()
-        else:
-            # update and draw the game
+        # update the monsters close enough to the player
+        self.enemy_sprites.update(self.player, delta_time)
+        time = self.end_phase("enemy_update", time)
 
-            # call the update method of every visible_sprite
-            self.visible_sprites.update()
+        # check for enemies and apply our logic
+        self.player_attack_logic()
+        self.end_phase("attack_logic", time)
 
-            # update all monsters
-            self.visible_sprites.enemy_update(self.player)
+    def draw_world(self):
+        time = perf_counter()
 
-            # check for enemies and apply our logic
-            self.player_attack_logic()
+        # draw all the visible sprites
+        self.visible_sprites.custom_draw(self.player)
+        time = self.end_phase("draw", time)
+
+        # display the data from the player using ui
+        self.ui.display(self.player)
+        self.end_phase("ui", time)
+
+    def draw(self):
+        if not self.game_paused:
+            self.draw_world()
+            self.dirty_rects = None
+            return
+
+        # nothing moves while the game is paused : the world is drawn once, dimmed, and kept in the snapshot
+        # then only the items of the upgrade menu that change are drawn over it
+        # (the snapshot is taken again when an upgrade changes what the ui shows)
+        snapshot_state = (self.player.exp, tuple(self.player.stats.values()))
+        if snapshot_state != self.snapshot_state:
+            self.snapshot = None
+            self.snapshot_state = snapshot_state
+        redraw = self.snapshot is None or self.redraw_snapshot
+        if self.snapshot is None:
+            self.display_surface.fill(WATER_COLOR)
+            self.draw_world()
+            self.display_surface.blit(self.dim_surface, (0, 0), special_flags=pygame.BLEND_RGB_MULT)
+            self.snapshot = self.display_surface.copy()
+        elif self.redraw_snapshot:
+            self.display_surface.blit(self.snapshot, (0, 0))
+
+        # display the upgrade menu
+        time = perf_counter()
+        menu_rects = self.upgrade.display(redraw)
+        self.end_phase("menu", time)
+
+        # the whole screen has changed when the snapshot has been drawn, only the menu items otherwise
+        self.dirty_rects = None if redraw else menu_rects
 
 
 # group for the camera
 class YSortCameraGroup(pygame.sprite.Group):
-    def __init__(self):
+    def __init__(self, particles):
         # general setup
         super().__init__()
         self.display_surface = pygame.display.get_surface()
 
+        # the particles are not sprites, they are drawn from their pool
+        self.particles = particles
+
+        # the tiles never move so they are stored already sorted,
+        # the other sprites (player, enemies, weapon) are checked and sorted every frame
+        self.static_sprites = YSortedStrips()
+        self.dynamic_sprites = {}
+
         # getting half the width and half the height of the screen
         self.half_width = self.display_surface.get_size()[0] // 2
         self.half_height = self.display_surface.get_size()[1] // 2
@@ -207,9 +316,38 @@ class YSortCameraGroup(pygame.sprite.Group):
         # set a vector for the camera (an offset coming from the player's movement)
         self.offset = pygame.math.Vector2()
 
-        # creating the floor
-        self.floor_surface = pygame.image.load("../graphics/tilemap/ground.png").convert()
-        self.floor_rect = self.floor_surface.get_rect(topleft=(0, 0))
+        # creating the floor (baked into chunks)
+        self.terrain = Terrain()
+
+    # * overwriting the methods used by pygame when a sprite joins or leaves a group
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if isinstance(sprite, Tile):
+            self.static_sprites.add(sprite)
+        else:
+            self.dynamic_sprites[sprite] = None
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if isinstance(sprite, Tile):
+            self.static_sprites.remove(sprite)
+        else:
+            self.dynamic_sprites.pop(sprite, None)
+
+    def get_view_rect(self):
+        # area of the map shown on the screen
+        return pygame.Rect(self.offset.x, self.offset.y, self.half_width * 2, self.half_height * 2)
+
+    def get_visible_sprites(self, view_rect):
+        # the tiles on screen, already sorted by their y coordinate
+        static_sprites = self.static_sprites.query(view_rect)
+
+        # only the moving sprites on screen need to be sorted
+        dynamic_sprites = sorted((sprite for sprite in self.dynamic_sprites if sprite.rect.colliderect(view_rect)),
+                                 key=lambda sprite: sprite.rect.centery)
+
+        # merge both sorted lists
+        return merge(static_sprites, dynamic_sprites, key=lambda sprite: sprite.rect.centery)
 
     # * overwriting the draw method of a group
     def custom_draw(self, player):
@@ -217,30 +355,23 @@ class YSortCameraGroup(pygame.sprite.Group):
         self.offset.x = player.rect.centerx - self.half_width
         self.offset.y = player.rect.centery - self.half_height
 
-        # drawing the floor
-
-        # removing the offset from the floor to figure out where to draw it
-        floor_offset_position = self.floor_rect.topleft - self.offset
-
-        self.display_surface.blit(self.floor_surface, floor_offset_position)
-
-        # for every sprite inside the sprite group
-        # we sort the sprites with their y coordinates 
-        for sprite in sorted(self.sprites(), key=lambda sprite: sprite.rect.centery):
-            # removing the offset from each sprite to figure out where to draw the sprites
-            offset_position = sprite.rect.topleft - self.offset
-
-            # draw the sprite 
-            self.display_surface.blit(sprite.image, offset_position)
-
-    def enemy_update(self, player):
-        # update the status of every enemy
-        enemy_sprites = []
-        # get the sprites of all enemies
-        for sprite in self.sprites():
-            if hasattr(sprite, "sprite_type"):
-                if sprite.sprite_type == "enemy":
-                    enemy_sprites.append(sprite)
-        for enemy in enemy_sprites:
-            # update enemies
-            enemy.enemy_update(player)
+        # drawing the floor (only the chunks on screen)
+        self.terrain.draw(self.offset)
+
+        # the sprites and the particles on screen, each sorted with their y coordinates : (y, image, topleft)
+        view_rect = self.get_view_rect()
+        sprites = ((sprite.rect.centery, sprite.image, sprite.rect.topleft)
+                   for sprite in self.get_visible_sprites(view_rect))
+        particles = self.particles.get_visible_particles(view_rect)
+
+        # removing the offset from each sprite to figure out where to draw the sprites
+        # (with integers : no vector is created for each sprite)
+        offset_x, offset_y = int(self.offset.x), int(self.offset.y)
+        blit_sequence = [(image, (x - offset_x, y - offset_y))
+                         for _, image, (x, y) in merge(sprites, particles, key=itemgetter(0))]
+
+        # draw every sprite and particle on screen, in order, in a single call
+        if hasattr(self.display_surface, "fblits"):
+            self.display_surface.fblits(blit_sequence)
+        else:
+            self.display_surface.blits(blit_sequence, doreturn=False)
@@ -1,6 +1,7 @@
 import pygame
 from settings import *
 from random import randint
+from sounds import get_sound
 
 class MagicPlayer:
     def __init__(self, animation_player):
@@ -8,11 +9,11 @@ class MagicPlayer:
 
         # sounds
         self.sounds = {
-            "heal": pygame.mixer.Sound("../audio/heal.wav"),
-            "flame": pygame.mixer.Sound("../audio/fire.wav")
+            "heal": get_sound("heal"),
+            "flame": get_sound("flame")
         }
 
-    def heal(self, player, strength, cost, groups):
+    def heal(self, player, strength, cost):
         if player.energy >= cost and player.health < player.stats["health"]:
             # increase health and decrease energy
             player.health += strength
@@ -23,10 +24,10 @@ class MagicPlayer:
 
             # play the aura and the heal animations
             self.sounds["heal"].play()
-            self.animation_player.create_particles("aura", player.rect.center, groups)
-            self.animation_player.create_particles("heal", player.rect.center + pygame.math.Vector2(0, -60), groups)
+            self.animation_player.create_particles("aura", player.rect.center)
+            self.animation_player.create_particles("heal", player.rect.center + pygame.math.Vector2(0, -60))
 
-    def flame(self, player, cost, groups):
+    def flame(self, player, cost):
         if player.energy >= cost:
             # draw 5 flame animations in the direction the player is facing
             player.energy -= cost
@@ -49,6 +50,7 @@ class MagicPlayer:
                 math_direction = pygame.math.Vector2(0, 1)
 
             self.sounds["flame"].play()
+            # the flames damage the enemies they touch
             for i in range(1,6):
                 if math_direction.x:
                     # horizontal placement
@@ -57,7 +59,7 @@ class MagicPlayer:
                     # add a random offset to make the flames diverge
                     x = player.rect.centerx + offset_x + randint(-TILESIZE // 3, TILESIZE // 3)
                     y = player.rect.centery + randint(-TILESIZE // 3, TILESIZE // 3)
-                    self.animation_player.create_particles("flame", (x, y), groups)
+                    self.animation_player.create_particles("flame", (x, y), attack=True)
                 else:
                     # vertical placement
                     # place 5 flames next to each other and to the player
@@ -65,6 +67,6 @@ class MagicPlayer:
                     # add a random offset to make the flames diverge
                     x = player.rect.centerx + randint(-TILESIZE // 3, TILESIZE // 3)
                     y = player.rect.centery + offset_y + randint(-TILESIZE // 3, TILESIZE // 3)
-                    self.animation_player.create_particles("flame", (x, y), groups)
+                    self.animation_player.create_particles("flame", (x, y), attack=True)
 
 
@@ -1,15 +1,44 @@
-import pygame
+import os
 import sys
+import random
+import argparse
+from time import perf_counter
+
+
+def get_arguments():
+    # command line arguments, eg : python main.py --headless --frames 3600 --seed 1
+    parser = argparse.ArgumentParser(description="Zelda Python")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without a window or sound, skip the title screen and don't cap the frame rate")
+    parser.add_argument("--frames", type=int, default=None, help="number of frames to run in headless mode")
+    parser.add_argument("--seconds", type=float, default=None,
+                        help="number of simulated seconds to run in headless mode (one step per frame)")
+    parser.add_argument("--seed", type=int, default=None, help="seed of the random generator")
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    arguments = get_arguments()
+    # the drivers must be chosen before pygame starts
+    if arguments.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+import pygame
+import numpy as np
 
 from level import Level
 from settings import *
+from sounds import get_sound
+from profiler import Profiler
 
 
 class Game:
-    def __init__(self):
+    def __init__(self, headless=False):
         # general setup for pygame
         pygame.init()
         self.screen = pygame.display.set_mode((WIDTH, HEIGTH))
+        self.headless = headless
 
         # setup title
         pygame.display.set_caption("Zelda Python")
@@ -24,15 +53,18 @@ class Game:
         # game level
         self.level = Level()
 
-        # for title screen
-        self.active = True
+        # performance overlay (and was it shown on the last frame ?)
+        self.profiler = Profiler(self.level)
+        self.overlay_shown = False
+
+        # for title screen (there is no title screen in headless mode)
+        self.active = not headless
         self.title_screen = pygame.image.load("../graphics/test/titlescreen.png")
         self.screen.blit(self.title_screen, (0, 0))
         pygame.display.flip()
 
         # sound_
-        self.main_sound = pygame.mixer.Sound("../audio/main.ogg")
-        self.main_sound.set_volume(0.8)
+        self.main_sound = get_sound("main")
 
     def run(self):
         while True:
@@ -45,19 +77,93 @@ class Game:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_u:
                         self.level.toggle_upgrade_menu()
+                # show the performance overlay through the F3 key, record the next frames through the F4 key
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_F3:
+                        self.profiler.toggle()
+                    if event.key == pygame.K_F4:
+                        self.profiler.start_capture()
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_RETURN and self.active:
                         self.active = False
                         self.main_sound.play(loops=-1)
+                        # the time spent on the title screen isn't simulated
+                        self.clock.tick()
 
             if not self.active:
+                # wait so that the game is drawn at FPS at most, and get the time since the last frame (in seconds)
+                frame_time = self.clock.tick(FPS) / 1000
+
+                self.profiler.begin_frame()
+                # while the game is paused, the level draws over the last frame
+                # (and the overlay must be drawn on the snapshot of the game again, or erased on the frame it's hidden)
+                if not self.level.game_paused:
+                    self.screen.fill(WATER_COLOR)
+                self.level.redraw_snapshot = self.profiler.visible or self.overlay_shown
+                self.overlay_shown = self.profiler.visible
+                # the level is updated by fixed steps to catch up with that time, then drawn
+                self.level.run(frame_time)
+                self.profiler.end_frame()
+                self.profiler.display()
+                # only update the parts of the screen that have changed
+                if self.level.dirty_rects is None or self.profiler.visible:
+                    pygame.display.update()
+                else:
+                    pygame.display.update(self.level.dirty_rects)
+
+    def run_headless(self, frames):
+        # run the level for a number of frames as fast as possible, and measure how long each frame takes
+        # (every frame is one step of the game : frames / TICK_RATE seconds are simulated)
+        frame_times = []
+        for frame in range(frames):
+            start = perf_counter()
+
+            # nobody is playing, but the events still have to be handled
+            pygame.event.pump()
+            if not self.level.game_paused:
                 self.screen.fill(WATER_COLOR)
-                self.level.run()
+            self.level.run(TICK_TIME)
+            if self.level.dirty_rects is None:
                 pygame.display.update()
-                self.clock.tick(FPS)
+            else:
+                pygame.display.update(self.level.dirty_rects)
+
+            frame_times.append(perf_counter() - start)
+
+        self.level.world.close()
+        pygame.quit()
+        return frame_times
+
+
+def print_frame_stats(frame_times):
+    # aggregate statistics of the frame times (in milliseconds)
+    if not frame_times:
+        print("no frame has been run")
+        return
+
+    milliseconds = np.array(frame_times) * 1000
+    total = milliseconds.sum() / 1000
+    print(f"frames: {len(milliseconds)}  total: {total:.2f}s  average fps: {len(milliseconds) / total:.1f}")
+    print(f"frame time (ms)  mean: {milliseconds.mean():.3f}  min: {milliseconds.min():.3f}  "
+          f"max: {milliseconds.max():.3f}")
+    print(f"                 p50: {np.percentile(milliseconds, 50):.3f}  p95: {np.percentile(milliseconds, 95):.3f}  "
+          f"p99: {np.percentile(milliseconds, 99):.3f}")
 
 
 # create an instance if it's the main class
 if __name__ == '__main__':
-    game = Game()
-    game.run()
+    if arguments.seed is not None:
+        random.seed(arguments.seed)
+
+    game = Game(arguments.headless)
+    if arguments.headless:
+        # the number of frames : given directly, or from the simulated seconds (one minute by default)
+        if arguments.frames is not None:
+            frames = arguments.frames
+        elif arguments.seconds is not None:
+            frames = round(arguments.seconds * TICK_RATE)
+        else:
+            frames = 60 * TICK_RATE
+        print_frame_stats(game.run_headless(frames))
+    else:
+        game.run()
@@ -1,10 +1,14 @@
 import pygame
+import numpy as np
+from settings import *
 from support import import_folder
 from random import choice
 
 class AnimationPlayer:
-    # import every single particle
+    # every particle is stored in a pool of arrays (one array per property, one index per particle) :
+    # creating a particle only fills a free index, and every particle is animated in one go
     def __init__(self):
+        # import every single particle
         self.frames = {
             # magic
             'flame': import_folder('../graphics/particles/flame/frames'),
@@ -40,6 +44,59 @@ class AnimationPlayer:
                 self.reflect_images(import_folder('../graphics/particles/leaf6'))
             )
         }
+        # speed of the animations (frames per second)
+        self.animation_speed = 9
+
+        # every animation gets a number : the particles only store that number
+        self.animations = []
+        self.animation_ids = {}
+        for animation_type, frames in self.frames.items():
+            if animation_type == "leaf":
+                # one number for each leaf animation
+                self.animation_ids[animation_type] = [self.add_animation(leaf_frames) for leaf_frames in frames]
+            else:
+                self.animation_ids[animation_type] = self.add_animation(frames)
+        # number of frames of each animation
+        self.lengths = np.array([len(frames) for frames in self.animations])
+
+        # * the pool
+        self.capacity = 0
+        self.alive = np.zeros(0, dtype=bool)
+        # number of the animation and current frame
+        self.animation = np.zeros(0, dtype=np.int16)
+        self.frame_index = np.zeros(0, dtype=np.float64)
+        # rectangle of the particle (it's placed with its first frame and doesn't move)
+        self.left = np.zeros(0, dtype=np.int32)
+        self.top = np.zeros(0, dtype=np.int32)
+        self.width = np.zeros(0, dtype=np.int32)
+        self.height = np.zeros(0, dtype=np.int32)
+        # does the particle damage the enemies (the flames)
+        self.attack = np.zeros(0, dtype=bool)
+        # when the particle has been created, to draw the particles at the same height in order
+        self.order = np.zeros(0, dtype=np.int64)
+        self.created = 0
+        # indexes that can be used by a new particle
+        self.free_indexes = []
+        self.grow(PARTICLE_POOL_SIZE)
+
+    def __len__(self):
+        # number of particles playing
+        return int(np.count_nonzero(self.alive))
+
+    def add_animation(self, frames):
+        self.animations.append(tuple(frames))
+        return len(self.animations) - 1
+
+    def grow(self, capacity):
+        # make every array bigger (the particles already playing keep their index)
+        extra = capacity - self.capacity
+        for name in ("alive", "animation", "frame_index", "left", "top", "width", "height", "attack", "order"):
+            array = getattr(self, name)
+            setattr(self, name, np.concatenate((array, np.zeros(extra, dtype=array.dtype))))
+
+        # the free indexes are used from the end of the list
+        self.free_indexes.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
 
     def reflect_images(self, frames):
         # import frames but reflected
@@ -50,34 +107,55 @@ class AnimationPlayer:
             new_frames.append(flipped_frame)
         return new_frames
 
-    def create_grass_particles(self, pos, groups):
+    def create_grass_particles(self, pos):
         # pick a random animation
-        animation_frames = choice(self.frames["leaf"])
-        ParticleEffect(pos, animation_frames, groups)
+        self.spawn(choice(self.animation_ids["leaf"]), pos)
 
-    def create_particles(self, animation_type, pos, groups):
+    def create_particles(self, animation_type, pos, attack=False):
         # pick the suitable animation
-        animation_frames = self.frames[animation_type]
-        ParticleEffect(pos, animation_frames, groups)
-
-
-class ParticleEffect(pygame.sprite.Sprite):
-    def __init__(self, pos, animation_frames, groups):
-        super().__init__(groups)
-        self.sprite_type = "magic"
-        self.frame_index = 0
-        self.animation_speed = 0.15
-        self.frames = animation_frames
-        self.image = self.frames[self.frame_index]
-        self.rect = self.image.get_rect(center=pos)
-
-    def animate(self):
-        # same as the one in player and enemy
-        self.frame_index += self.animation_speed
-        if self.frame_index >= len(self.frames):
-            self.kill()
-        else:
-            self.image = self.frames[int(self.frame_index)]
-
-    def update(self):
-        self.animate()
\ No newline at end of file
+        self.spawn(self.animation_ids[animation_type], pos, attack)
+
+    def spawn(self, animation_id, pos, attack=False):
+        # the pool is full : double its size
+        if not self.free_indexes:
+            self.grow(self.capacity * 2)
+        index = self.free_indexes.pop()
+
+        rect = self.animations[animation_id][0].get_rect(center=pos)
+        self.alive[index] = True
+        self.animation[index] = animation_id
+        self.frame_index[index] = 0
+        self.left[index], self.top[index], self.width[index], self.height[index] = rect
+        self.attack[index] = attack
+        self.order[index] = self.created
+        self.created += 1
+
+    def update(self, delta_time):
+        # same animation as the one in player and enemy, for every particle at once
+        playing = np.flatnonzero(self.alive)
+        self.frame_index[playing] += self.animation_speed * delta_time
+
+        # the particles at the end of their animation are removed and their indexes can be used again
+        finished = playing[self.frame_index[playing] >= self.lengths[self.animation[playing]]]
+        self.alive[finished] = False
+        self.free_indexes.extend(finished.tolist())
+
+    def get_attack_rects(self):
+        # rectangles of the particles that damage the enemies
+        attacking = np.flatnonzero(self.alive & self.attack)
+        return [pygame.Rect(left, top, width, height) for left, top, width, height in
+                zip(self.left[attacking].tolist(), self.top[attacking].tolist(),
+                    self.width[attacking].tolist(), self.height[attacking].tolist())]
+
+    def get_visible_particles(self, rect):
+        # every particle that collides with the rectangle : (y coordinate of its center, image, topleft),
+        # sorted by their y coordinate like the sprites
+        visible = np.flatnonzero(self.alive & (self.left < rect.right) & (self.left + self.width > rect.left) &
+                                 (self.top < rect.bottom) & (self.top + self.height > rect.top))
+        centery = self.top[visible] + self.height[visible] // 2
+        visible = visible[np.lexsort((self.order[visible], centery))]
+
+        return [(top + height // 2, self.animations[animation][int(frame_index)], (left, top))
+                for animation, frame_index, left, top, height in
+                zip(self.animation[visible].tolist(), self.frame_index[visible].tolist(), self.left[visible].tolist(),
+                    self.top[visible].tolist(), self.height[visible].tolist())]
@@ -1,7 +1,9 @@
 import pygame
 from settings import *
-from support import import_folder
+from support import import_folder, import_hidden_folder
 from entity import Entity
+from sounds import get_sound
+import game_time
 
 
 class Player(Entity):
@@ -27,10 +29,10 @@ class Player(Entity):
 
         # * STATS
         self.stats = {"health": 100, "energy": 60,
-                      "attack": 10, "magic": 4, "speed": 6}
+                      "attack": 10, "magic": 4, "speed": 360}
 
-        # max_stats
-        self.max_stats = {"health":300, "energy":140, "attack":20, "magic":10, "speed":10}
+        # max_stats (the speed is in pixels per second)
+        self.max_stats = {"health":300, "energy":140, "attack":20, "magic":10, "speed":600}
 
         # upgrade costs (in EXP)
         self.upgrade_cost = {"health":100, "energy":100, "attack":100, "magic": 100, "speed":100}
@@ -85,8 +87,7 @@ class Player(Entity):
         self.magic_switch_time = None
 
         # sounds
-        self.weapon_attack_sound = pygame.mixer.Sound("../audio/sword.wav")
-        self.weapon_attack_sound.set_volume(0.4)
+        self.weapon_attack_sound = get_sound("sword")
 
     def import_player_assets(self):
 
@@ -98,9 +99,12 @@ class Player(Entity):
                            "right_attack": [], "left_attack": [], "up_attack": [], "down_attack": [], }
 
         # grab the sprites for animations from the matching folder using our method
+        # and the hidden version of every frame (shown when flickering)
+        self.hidden_animations = {}
         for animation in self.animations.keys():
             fullpath = character_path + animation
             self.animations[animation] = import_folder(fullpath)
+            self.hidden_animations[animation] = import_hidden_folder(fullpath)
 
     def input(self):
 
@@ -143,14 +147,14 @@ class Player(Entity):
             if (keys[pygame.K_SPACE]):
                 # start the attack aand set the time it has been started
                 self.attacking = True
-                self.attack_time = pygame.time.get_ticks()
+                self.attack_time = game_time.get_ticks()
                 self.create_attack()
                 self.weapon_attack_sound.play()
 
             # * MAGIC INPUT
             if (keys[pygame.K_LCTRL]):
                 self.attacking = True
-                self.attack_time = pygame.time.get_ticks()
+                self.attack_time = game_time.get_ticks()
                 style = list(magic_data.keys())[self.magic_index]
                 strength = list(magic_data.values())[self.magic_index]['strength'] + self.stats['magic']
                 cost = list(magic_data.values())[self.magic_index]['cost']
@@ -160,7 +164,7 @@ class Player(Entity):
             if (keys[pygame.K_q]) and self.can_switch_weapon:
                 # switch the weapon aand set the time it has been started
                 self.can_switch_weapon = False
-                self.weapon_switch_time = pygame.time.get_ticks()
+                self.weapon_switch_time = game_time.get_ticks()
                 self.weapon_index = (
                                             self.weapon_index + 1) % len(weapon_data.keys())
                 self.weapon = list(weapon_data.keys())[self.weapon_index]  # * SWITCH WEAPON
@@ -170,7 +174,7 @@ class Player(Entity):
             if (keys[pygame.K_p]) and self.can_switch_magic:
                 # switch the magic aand set the time it has been started
                 self.can_switch_magic = False
-                self.magic_switch_time = pygame.time.get_ticks()
+                self.magic_switch_time = game_time.get_ticks()
                 self.magic_index = (
                                            self.magic_index + 1) % len(magic_data.keys())
                 self.magic = list(weapon_data.keys())[self.magic_index]
@@ -209,7 +213,7 @@ class Player(Entity):
     def cooldowns(self):
 
         # get the current time
-        current_time = pygame.time.get_ticks()
+        current_time = game_time.get_ticks()
 
         # check if an attack has been done and the cooldown has passed, then get self.attacking to False again
         if self.attacking:
@@ -231,12 +235,12 @@ class Player(Entity):
             if current_time - self.hurt_time >= self.invulnerability_duration:
                 self.vulnerable = True
 
-    def animate(self):
+    def animate(self, delta_time):
         # get all the images for the current animation according to the current status
         animation = self.animations[self.status]
 
         # loop over the frame index to get the image to display
-        self.frame_index += self.animation_speed
+        self.frame_index += self.animation_speed * delta_time
         if self.frame_index >= len(animation):
             # go back to the first frame when the loop is complete
             self.frame_index = 0
@@ -250,12 +254,10 @@ class Player(Entity):
         if not self.vulnerable:
             alpha = self.flicker_value()
             # when alpha = 255, the player is displayed
-            # when alpha = 0, nothing appears
-            # thus creating a flickering effect
-            self.image.set_alpha(alpha)
-        else:
-            # get back to its state
-            self.image.set_alpha(255)
+            # when alpha = 0, the hidden version of the frame appears (a transparent surface)
+            # thus creating a flickering effect without changing the frames (they are shared)
+            if alpha == 0:
+                self.image = self.hidden_animations[self.status][int(self.frame_index)]
 
     def get_full_weapon_damage(self):
         # return the full damage of the player, their attack + weapon's attack
@@ -279,17 +281,17 @@ class Player(Entity):
     def get_cost_by_index(self, index):
         return list(self.upgrade_cost.values())[index]
 
-    def energy_recovery(self):
-        # recover energy gradually
+    def energy_recovery(self, delta_time):
+        # recover energy gradually (0.3 energy per second for each point of magic)
         if self.energy < self.stats["energy"]:
-            self.energy += 0.005 * self.stats["magic"]
+            self.energy += 0.3 * self.stats["magic"] * delta_time
         else:
             self.energy = self.stats["energy"]
 
-    def update(self):
+    def update(self, delta_time):
         self.input()
         self.cooldowns()
         self.get_status()
-        self.animate()
-        self.move(self.stats["speed"])
-        self.energy_recovery()
+        self.animate(delta_time)
+        self.move(self.stats["speed"], delta_time)
+        self.energy_recovery(delta_time)
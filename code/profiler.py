@@ -0,0 +1,115 @@
+import os
+import pygame
+import cProfile
+from collections import deque
+from datetime import datetime
+from time import perf_counter
+from settings import *
+from debug import debug
+
+
+class Profiler:
+    # performance overlay, shown over the game : frame times, phases of the level, number of sprites
+    # it can also record a cProfile capture of the next frames (saved as a .pstats file)
+    def __init__(self, level):
+        self.display_surface = pygame.display.get_surface()
+        self.level = level
+
+        # is the overlay shown ?
+        self.visible = False
+
+        # time taken by the last frames, and by each phase of the level during the last frames (in seconds)
+        self.frame_times = deque(maxlen=PROFILER_HISTORY)
+        self.phase_times = {}
+        self.frame_start = 0
+
+        # cProfile capture (None if nothing is being recorded)
+        self.profile = None
+        self.capture_frames_left = 0
+        self.last_capture = None
+
+        # frame time graph (top right of the screen, the text is under the health and energy bars)
+        self.graph_rect = pygame.Rect(WIDTH - PROFILER_HISTORY * 2 - 10, 10, PROFILER_HISTORY * 2, 100)
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def start_capture(self, frames=PROFILER_CAPTURE_FRAMES):
+        # record the next frames (if nothing is already being recorded)
+        if self.profile is None:
+            self.profile = cProfile.Profile()
+            self.capture_frames_left = frames
+
+    def begin_frame(self):
+        self.frame_start = perf_counter()
+        if self.profile:
+            self.profile.enable()
+
+    def end_frame(self):
+        if self.profile:
+            self.profile.disable()
+            self.capture_frames_left -= 1
+            if self.capture_frames_left <= 0:
+                self.save_capture()
+
+        self.frame_times.append(perf_counter() - self.frame_start)
+        for phase, time in self.level.phase_times.items():
+            if phase not in self.phase_times:
+                self.phase_times[phase] = deque(maxlen=PROFILER_HISTORY)
+            self.phase_times[phase].append(time)
+
+    def save_capture(self):
+        # open it with : python -m pstats <file>, or snakeviz
+        os.makedirs(PROFILER_FOLDER, exist_ok=True)
+        self.last_capture = f"{PROFILER_FOLDER}/profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pstats"
+        self.profile.dump_stats(self.last_capture)
+        self.profile = None
+
+    def draw_graph(self):
+        # one bar per frame (2 pixels wide), the line is the time available for a frame at FPS
+        pygame.draw.rect(self.display_surface, "Black", self.graph_rect)
+        budget = 1 / FPS
+        for index, time in enumerate(self.frame_times):
+            height = min(int(time / (budget * 2) * self.graph_rect.height), self.graph_rect.height)
+            color = "Green" if time <= budget else "Red"
+            x = self.graph_rect.left + index * 2
+            pygame.draw.line(self.display_surface, color, (x, self.graph_rect.bottom - 1),
+                             (x, self.graph_rect.bottom - height))
+        budget_y = self.graph_rect.bottom - self.graph_rect.height // 2
+        pygame.draw.line(self.display_surface, "White", (self.graph_rect.left, budget_y),
+                         (self.graph_rect.right, budget_y))
+
+    def get_lines(self):
+        # text of the overlay, one string per line
+        frame_ms = [time * 1000 for time in self.frame_times]
+        lines = [f"frame {frame_ms[-1]:.2f} ms   average {sum(frame_ms) / len(frame_ms):.2f} ms   "
+                 f"max {max(frame_ms):.2f} ms"]
+
+        # average time of each phase of the level
+        for phase, times in self.phase_times.items():
+            lines.append(f"{phase} {sum(times) / len(times) * 1000:.3f} ms")
+
+        # number of sprites in each group
+        level = self.level
+        lines.append(f"visible {len(level.visible_sprites)}   obstacles {len(level.obstacle_sprites)}   "
+                     f"grass {len(level.grass_sprites)}   objects {len(level.object_sprites)}   "
+                     f"attacks {len(level.attack_sprites)}")
+        counts = level.enemy_sprites.counts
+        lines.append(f"enemies {len(level.enemy_sprites)} (full {counts['full']}   reduced {counts['reduced']}   "
+                     f"sleeping {counts['sleeping']})   particles {len(level.animation_player)}")
+        lines.append(f"chunks {len(level.world.loaded_chunks)}   loading {len(level.world.pending_chunks)}")
+
+        # cProfile capture
+        if self.profile:
+            lines.append(f"recording : {self.capture_frames_left} frames left")
+        elif self.last_capture:
+            lines.append(f"saved {self.last_capture}")
+        return lines
+
+    def display(self):
+        if not self.visible or not self.frame_times:
+            return
+
+        for index, line in enumerate(self.get_lines()):
+            debug(line, 70 + index * 25)
+        self.draw_graph()
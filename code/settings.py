@@ -6,12 +6,57 @@ HEIGTH = 720
 FPS = 60
 TILESIZE = 64
 
+# the game is updated by fixed steps of 1 / TICK_RATE seconds, whatever the frame rate (FPS only limits the drawing) :
+# a slow frame is caught up with several steps, up to MAX_STEPS_PER_FRAME (after that the game slows down)
+TICK_RATE = 60
+TICK_TIME = 1 / TICK_RATE
+MAX_STEPS_PER_FRAME = 5
+# the clock only waits whole milliseconds (16 or 17 ms for a 16.67 ms step) : a frame time that close to a whole
+# number of steps (in seconds) counts as exactly that number of steps, so that no frame is drawn without a step
+FRAME_SNAP_TIME = 0.001
+
+# the floor is baked into square chunks of CHUNK_SIZE pixels
+CHUNK_SIZE = 512
+
+# the world is loaded by chunks : the chunks up to STREAM_RADIUS chunks away from the player are loaded,
+# and they're unloaded once they are more than UNLOAD_RADIUS chunks away
+STREAM_RADIUS = 2
+UNLOAD_RADIUS = 3
+
 HITBOX_OFFSET = {
     "player": -26,
     "object": -40,
     "grass": -10,
     "invisible": 0
 }
+# map
+# the csv layers are compiled into MAP_FILE by compile_map.py (the game reads the csv files if it doesn't exist or is older)
+MAP_FILE = '../map/map.bin'
+map_layers = {
+    'floor': '../map/map_Floor.csv',
+    'details': '../map/map_Details.csv',
+    'boundary': '../map/map_FloorBlocks.csv',
+    'grass': '../map/map_Grass.csv',
+    'object': '../map/map_LargeObjects.csv',
+    'entity': '../map/map_Entities.csv'
+}
+
+# graphics
+GRAPHICS_FOLDER = '../graphics'
+# the images are packed into a few atlases by build_atlas.py, the manifest tells where each image is
+ATLAS_FOLDER = '../graphics/atlas'
+ATLAS_MANIFEST = '../graphics/atlas/manifest.json'
+ATLAS_SIZE = 2048
+# folders (inside the graphics folder) that are not packed : big images loaded on their own
+ATLAS_EXCLUDED = ['atlas', 'font', 'test', 'tilemap']
+
+# floor
+# pre-rendered floor, it already contains the floor and details layers (with shadows that aren't in the csv files)
+FLOOR_IMAGE = '../graphics/tilemap/ground.png'
+# tile layers baked on top of the floor image, in order : the map layer and the tileset (cut in tiles of TILESIZE)
+# eg : {'layer': 'details', 'tileset': '../graphics/tilemap/details.png'}
+floor_layers = []
+
 # weapons
 weapon_data = {
     'sword': {'cooldown': 100, 'damage': 15, 'graphic': '../graphics/weapons/sword/full.png'},
@@ -28,6 +73,8 @@ ENERGY_BAR_WIDTH = 140
 ITEM_BOX_SIZE = 80
 UI_FONT = '../graphics/font/joystix.ttf'
 UI_FONT_SIZE = 18
+# number of rendered texts kept in the text cache (the least recently used ones are removed first)
+TEXT_CACHE_SIZE = 128
  
 # general colors
 WATER_COLOR = '#71ddee'
@@ -41,6 +88,9 @@ ENERGY_COLOR = 'blue'
 UI_BORDER_COLOR_ACTIVE = 'gold'
  
 # upgrade menu
+# while the menu is open, the game is frozen in a snapshot, dimmed by multiplying its colors by PAUSE_DIM_COLOR
+# ((255, 255, 255) : not dimmed)
+PAUSE_DIM_COLOR = (150, 150, 150)
 TEXT_COLOR_SELECTED = '#111111'
 BAR_COLOR = '#EEEEEE'
 BAR_COLOR_SELECTED = '#111111'
@@ -59,17 +109,51 @@ magic_data = {
     'heal': {'strength': 20,'cost': 10,'graphic':'../graphics/particles/heal/heal.png'}
 }
 
+# particles
+# number of particles the pool is created with (it grows if a fight needs more)
+PARTICLE_POOL_SIZE = 256
+
+# sounds : every file is loaded once and shared by everyone who plays it
+sound_data = {
+    'main': {'path': '../audio/main.ogg', 'volume': 0.8},
+    'sword': {'path': '../audio/sword.wav', 'volume': 0.4},
+    'heal': {'path': '../audio/heal.wav', 'volume': 1},
+    'flame': {'path': '../audio/Fire.wav', 'volume': 1},
+    'death': {'path': '../audio/death.wav', 'volume': 0.2},
+    'hit': {'path': '../audio/hit.wav', 'volume': 0.2},
+    'slash': {'path': '../audio/attack/slash.wav', 'volume': 0.3},
+    'claw': {'path': '../audio/attack/claw.wav', 'volume': 0.3},
+    'fireball': {'path': '../audio/attack/fireball.wav', 'volume': 0.3}}
+
+# entities flicker after being hit : they're shown and hidden every FLICKER_INTERVAL milliseconds
+FLICKER_INTERVAL = 50
+
+# profiler overlay (F3 : show it, F4 : record a cProfile capture of PROFILER_CAPTURE_FRAMES frames)
+# number of frames shown in the frame time graph
+PROFILER_HISTORY = 120
+PROFILER_CAPTURE_FRAMES = 300
+# folder where the captures are saved (.pstats files)
+PROFILER_FOLDER = '../profiles'
+
+# enemy level of detail (distances from the player in pixels)
+# enemies closer than their notice radius or AI_FULL_DISTANCE (enough to be on screen) are updated every step,
+# enemies closer than AI_SLEEP_DISTANCE are updated once every AI_SLICES steps, the others aren't updated
+AI_FULL_DISTANCE = 800
+AI_SLEEP_DISTANCE = 1600
+AI_SLICES = 4
+
 # enemy
+# (speed : pixels per second)
 monster_data = {
     'squid': {'health': 100, 'exp': 100, 'damage': 20, 'attack_type': 'slash',
-              'attack_sound': '../audio/attack/slash.wav', 'speed': 3, 'resistance': 3, 'attack_radius': 80,
+              'attack_sound': 'slash', 'speed': 180, 'resistance': 3, 'attack_radius': 80,
               'notice_radius': 360},
     'raccoon': {'health': 300, 'exp': 250, 'damage': 40, 'attack_type': 'claw',
-                'attack_sound': '../audio/attack/claw.wav', 'speed': 2, 'resistance': 3, 'attack_radius': 120,
+                'attack_sound': 'claw', 'speed': 120, 'resistance': 3, 'attack_radius': 120,
                 'notice_radius': 400},
     'spirit': {'health': 100, 'exp': 110, 'damage': 8, 'attack_type': 'thunder',
-               'attack_sound': '../audio/attack/fireball.wav', 'speed': 4, 'resistance': 3, 'attack_radius': 60,
+               'attack_sound': 'fireball', 'speed': 240, 'resistance': 3, 'attack_radius': 60,
                'notice_radius': 350},
     'bamboo': {'health': 70, 'exp': 120, 'damage': 6, 'attack_type': 'leaf_attack',
-               'attack_sound': '../audio/attack/slash.wav', 'speed': 3, 'resistance': 3, 'attack_radius': 50,
+               'attack_sound': 'slash', 'speed': 180, 'resistance': 3, 'attack_radius': 50,
                'notice_radius': 300}}
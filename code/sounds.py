@@ -0,0 +1,15 @@
+import pygame
+from settings import *
+
+# name -> sound, every sound is loaded once and then shared
+sounds = {}
+
+
+def get_sound(name):
+    # load the sound the first time it's asked for, with the volume of its category
+    if name not in sounds:
+        sound = pygame.mixer.Sound(sound_data[name]["path"])
+        sound.set_volume(sound_data[name]["volume"])
+        sounds[name] = sound
+
+    return sounds[name]
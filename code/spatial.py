@@ -0,0 +1,166 @@
+import pygame
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from settings import *
+
+
+class SpatialGroup(pygame.sprite.Group):
+    # a sprite group that also keeps its sprites in a uniform grid (a spatial hash)
+    # so that we can only look at the sprites that are close to a given rectangle
+    # * only use it for sprites that do not move, the grid is only updated when a sprite is added or removed
+    def __init__(self, rect_attribute="rect", cell_size=TILESIZE):
+        super().__init__()
+        # the rectangle of the sprite used to place it in the grid (rect or hitbox)
+        self.rect_attribute = rect_attribute
+        self.cell_size = cell_size
+
+        # (column, row) -> sprites inside of that cell
+        self.cells = {}
+        # sprite -> cells it has been placed in (to remove it later)
+        self.sprite_cells = {}
+
+    def get_cells(self, rect):
+        # get every cell that the rectangle overlaps
+        left = rect.left // self.cell_size
+        right = (rect.right - 1) // self.cell_size
+        top = rect.top // self.cell_size
+        bottom = (rect.bottom - 1) // self.cell_size
+
+        return [(column, row) for row in range(top, bottom + 1) for column in range(left, right + 1)]
+
+    # * overwriting the methods used by pygame when a sprite joins or leaves a group
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+
+        cells = self.get_cells(getattr(sprite, self.rect_attribute))
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(sprite)
+        self.sprite_cells[sprite] = cells
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+
+        # remove the sprite from the cells (a killed grass for example)
+        for cell in self.sprite_cells.pop(sprite, ()):
+            cell_sprites = self.cells[cell]
+            cell_sprites.remove(sprite)
+            if not cell_sprites:
+                del self.cells[cell]
+
+    def query(self, rect):
+        # get every sprite placed in the cells overlapped by the rectangle
+        # a sprite can be in several cells, so we use a dictionnary to keep each sprite once (and keep the order)
+        found = {}
+        for cell in self.get_cells(rect):
+            for sprite in self.cells.get(cell, ()):
+                found[sprite] = None
+
+        return list(found)
+
+    def collide(self, rect):
+        # get the sprites that really collide with the rectangle (not only the ones in the same cells)
+        return [sprite for sprite in self.query(rect) if getattr(sprite, self.rect_attribute).colliderect(rect)]
+
+
+class ObstacleGroup(SpatialGroup):
+    # obstacles of the map : the boundary is stored as a grid of booleans (one byte per tile),
+    # the other obstacles (grass, objects) are sprites stored in the spatial hash
+    def __init__(self):
+        super().__init__("hitbox")
+
+        # size of the boundary grid (in tiles)
+        self.columns = 0
+        self.rows = 0
+        # 1 if the tile is blocked, 0 otherwise
+        self.blocked = bytearray()
+
+    def set_boundary(self, layout):
+        # build the grid from the boundary layout (every cell that isn't -1 is blocked)
+        self.rows, self.columns = layout.shape
+        self.blocked = bytearray((layout != -1).tobytes())
+
+    def is_blocked(self, column, row):
+        # nothing blocks outside of the map
+        if 0 <= column < self.columns and 0 <= row < self.rows:
+            return self.blocked[row * self.columns + column] == 1
+        return False
+
+    def get_obstacle_rects(self, rect):
+        # get the hitboxes of every obstacle around the rectangle
+        # first the blocked tiles, computed from the grid
+        rects = []
+        for column, row in self.get_cells(rect):
+            if self.is_blocked(column, row):
+                rects.append(pygame.Rect(column * TILESIZE, row * TILESIZE, TILESIZE, TILESIZE))
+
+        # then the obstacle sprites
+        for sprite in self.query(rect):
+            rects.append(sprite.hitbox)
+
+        return rects
+
+
+class YSortedStrips:
+    # index for sprites that never move, already sorted for the camera
+    # the map is cut in vertical strips, each strip keeps its sprites sorted by their y coordinate,
+    # so the sprites on screen can be found (and are already in order) without sorting every frame
+    def __init__(self, strip_width=TILESIZE * 8):
+        self.strip_width = strip_width
+
+        # strip index -> y coordinates of the sprites (to search with bisect) and the sprites in the same order
+        self.keys = {}
+        self.strips = {}
+
+        # size of the biggest sprite, to find the sprites that start outside of the screen but still appear on it
+        self.max_width = 0
+        self.max_height = 0
+
+    def __len__(self):
+        return sum(len(strip) for strip in self.strips.values())
+
+    def add(self, sprite):
+        # place the sprite in the strip where it starts, right after the sprites with the same y coordinate
+        strip_index = sprite.rect.left // self.strip_width
+        keys = self.keys.setdefault(strip_index, [])
+        strip = self.strips.setdefault(strip_index, [])
+
+        index = bisect_right(keys, sprite.rect.centery)
+        keys.insert(index, sprite.rect.centery)
+        strip.insert(index, sprite)
+
+        self.max_width = max(self.max_width, sprite.rect.width)
+        self.max_height = max(self.max_height, sprite.rect.height)
+
+    def remove(self, sprite):
+        strip_index = sprite.rect.left // self.strip_width
+        keys = self.keys.get(strip_index, [])
+        strip = self.strips.get(strip_index, [])
+
+        # look only at the sprites with the same y coordinate
+        index = bisect_left(keys, sprite.rect.centery)
+        while index < len(strip) and keys[index] == sprite.rect.centery:
+            if strip[index] is sprite:
+                del keys[index]
+                del strip[index]
+                return
+            index += 1
+
+    def query(self, rect):
+        # get every sprite that collides with the rectangle, sorted by y coordinate
+        first_strip = (rect.left - self.max_width) // self.strip_width
+        last_strip = (rect.right - 1) // self.strip_width
+
+        sorted_slices = []
+        for strip_index in range(first_strip, last_strip + 1):
+            if strip_index not in self.strips:
+                continue
+            keys = self.keys[strip_index]
+            strip = self.strips[strip_index]
+
+            # only the sprites whose center is close enough from the rectangle can collide with it
+            start = bisect_left(keys, rect.top - self.max_height)
+            end = bisect_right(keys, rect.bottom + self.max_height)
+            sorted_slices.append([sprite for sprite in strip[start:end] if sprite.rect.colliderect(rect)])
+
+        # every slice is sorted, so merging them keeps the order
+        return merge(*sorted_slices, key=lambda sprite: sprite.rect.centery)
@@ -1,6 +1,28 @@
 from csv import reader
-from os import walk
+from collections import OrderedDict
+from os import walk, sep as os_sep, path as os_path
+import json
+import struct
+import numpy as np
 import pygame
+from settings import *
+
+# * ASSET CACHE
+# every image is decoded once and shared by everyone who asks for the same path
+# path -> surface (for an image) or tuple of surfaces (for a folder)
+asset_cache = {}
+asset_cache_stats = {"hits": 0, "misses": 0}
+
+# * TEXT CACHE
+# texts rendered by the ui and the upgrade menu : (font, text, color, antialias) -> surface
+# only the TEXT_CACHE_SIZE most recently used texts are kept (the order of the dictionnary is the order of use)
+text_cache = OrderedDict()
+text_cache_stats = {"hits": 0, "misses": 0}
+
+# * ATLAS
+# images packed by build_atlas.py, loaded from the manifest the first time an image is needed
+# (if the atlas hasn't been built, every image is loaded from its own file)
+atlas = {"loaded": False, "images": {}, "folders": {}}
 
 def import_csv_layout(path):
 
@@ -10,26 +32,201 @@ def import_csv_layout(path):
         # returns an object containing numbers (as the csv file) :
         # example for boundary : 395 invisible block, -1 : nothing
         layout = reader(level_map, delimiter=',')
-        
+
         # store each row of number as a list inside terrain_map, and return it
         for row in layout:
             terrain_map.append(list(row))
         return terrain_map
 
+# * COMPILED MAP
+# header : "ZMAP", version, number of columns, rows and layers, then the name of every layer (16 bytes each)
+# then every layer as little-endian int16, row by row (-1 : nothing)
+MAP_MAGIC = b"ZMAP"
+MAP_VERSION = 1
+MAP_HEADER = struct.Struct("<4sHHHH")
+MAP_LAYER_NAME = struct.Struct("16s")
+
+# the map is loaded once and shared (by the level and the terrain)
+map_cache = {}
+
+def import_map(path=MAP_FILE):
+    # get every layer of the map as a 2d array of integers : layer name -> array[row, column]
+    if path in map_cache:
+        return map_cache[path]
+
+    if is_map_compiled(path):
+        map_cache[path] = load_compiled_map(path)
+    else:
+        # the map hasn't been compiled (or has been edited since), read the csv files
+        map_cache[path] = {name: np.array(import_csv_layout(csv_path), dtype=np.int16)
+                           for name, csv_path in map_layers.items()}
+    return map_cache[path]
+
+def is_map_compiled(path):
+    # the compiled map exists and is newer than every csv layer
+    if not os_path.exists(path):
+        return False
+    compiled_time = os_path.getmtime(path)
+    if any(os_path.getmtime(csv_path) > compiled_time for csv_path in map_layers.values()):
+        print(f"{path} is older than the csv layers of the map, run compile_map.py to compile it again")
+        return False
+    return True
+
+def load_compiled_map(path):
+    with open(path, "rb") as map_file:
+        magic, version, columns, rows, layer_count = MAP_HEADER.unpack(map_file.read(MAP_HEADER.size))
+        if magic != MAP_MAGIC or version != MAP_VERSION:
+            raise ValueError(f"{path} is not a compiled map (version {MAP_VERSION}), run compile_map.py")
+        names = [MAP_LAYER_NAME.unpack(map_file.read(MAP_LAYER_NAME.size))[0].rstrip(b"\0").decode()
+                 for _ in range(layer_count)]
+
+    # the layers are mapped from the file, not parsed
+    offset = MAP_HEADER.size + MAP_LAYER_NAME.size * layer_count
+    layers = np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(layer_count, rows, columns))
+    return {name: layers[index] for index, name in enumerate(names)}
+
+def save_compiled_map(path, layers):
+    # every layer must have the same size
+    rows, columns = next(iter(layers.values())).shape
+    with open(path, "wb") as map_file:
+        map_file.write(MAP_HEADER.pack(MAP_MAGIC, MAP_VERSION, columns, rows, len(layers)))
+        for name in layers.keys():
+            map_file.write(MAP_LAYER_NAME.pack(name.encode()))
+        for layer in layers.values():
+            map_file.write(np.asarray(layer, dtype="<i2").tobytes())
+
+def load_atlas():
+    atlas["loaded"] = True
+    if not os_path.exists(ATLAS_MANIFEST):
+        return
+
+    with open(ATLAS_MANIFEST) as manifest_file:
+        manifest = json.load(manifest_file)
+
+    # every atlas is decoded once and the images are cut out of it
+    # (they are copied : blitting a subsurface is about twice as slow as blitting a surface)
+    atlas_surfaces = [pygame.image.load(ATLAS_FOLDER + "/" + name).convert_alpha() for name in manifest["atlases"]]
+    for name, (atlas_index, x, y, width, height) in manifest["images"].items():
+        atlas["images"][name] = atlas_surfaces[atlas_index].subsurface((x, y, width, height)).copy()
+    atlas["folders"] = manifest["folders"]
+
+def get_atlas_name(path):
+    # the manifest uses paths relative to the graphics folder (eg : "../graphics/player/down" -> "player/down")
+    if not atlas["loaded"]:
+        load_atlas()
+    return os_path.relpath(os_path.normpath(path), os_path.normpath(GRAPHICS_FOLDER)).replace(os_sep, "/")
+
+def get_cache_key(kind, path):
+    # the same folder can be written in different ways (eg : "../graphics/player/" and "../graphics/player")
+    return kind, os_path.normpath(path)
+
+def import_image(path):
+    # load an image once, then give the same surface every time
+    key = get_cache_key("image", path)
+    if key in asset_cache:
+        asset_cache_stats["hits"] += 1
+        return asset_cache[key]
+
+    asset_cache_stats["misses"] += 1
+    name = get_atlas_name(path)
+    if name in atlas["images"]:
+        asset_cache[key] = atlas["images"][name]
+    else:
+        asset_cache[key] = pygame.image.load(path).convert_alpha()
+    return asset_cache[key]
+
 # getting every file in a folder
 def import_folder(path):
+    # the frames are shared by every sprite using them, so they are given as a tuple (it can't be changed)
+    key = get_cache_key("folder", path)
+    if key in asset_cache:
+        asset_cache_stats["hits"] += 1
+        return asset_cache[key]
+
+    asset_cache_stats["misses"] += 1
+    name = get_atlas_name(path)
+    if name in atlas["folders"]:
+        asset_cache[key] = tuple(atlas["images"][image_name] for image_name in atlas["folders"][name])
+    else:
+        asset_cache[key] = tuple(load_folder(path))
+    return asset_cache[key]
+
+def get_hidden_surface(size):
+    # a transparent surface : shown instead of a frame while an entity flickers
+    # (every frame of the same size shares it, it's never changed)
+    key = ("hidden", tuple(size))
+    if key not in asset_cache:
+        asset_cache[key] = pygame.Surface(size, pygame.SRCALPHA)
+    return asset_cache[key]
+
+def import_hidden_folder(path):
+    # the hidden version of every frame of a folder (same sizes, so the rect doesn't change when flickering)
+    key = get_cache_key("hidden folder", path)
+    if key not in asset_cache:
+        asset_cache[key] = tuple(get_hidden_surface(frame.get_size()) for frame in import_folder(path))
+    return asset_cache[key]
+
+def import_font(path, size):
+    # every font is loaded once, so everyone using it shares the same rendered texts
+    key = ("font", os_path.normpath(path), size)
+    if key not in asset_cache:
+        asset_cache[key] = pygame.font.Font(path, size)
+    return asset_cache[key]
+
+def render_text(font, text, color, antialias=False):
+    # render a text once, then give the same surface while it's used (it must not be changed)
+    key = (font, text, color, antialias)
+    if key in text_cache:
+        text_cache_stats["hits"] += 1
+        text_cache.move_to_end(key)
+        return text_cache[key]
+
+    text_cache_stats["misses"] += 1
+    text_cache[key] = font.render(text, antialias, color)
+    # remove the least recently used text
+    if len(text_cache) > TEXT_CACHE_SIZE:
+        text_cache.popitem(last=False)
+    return text_cache[key]
+
+def evict_asset(path):
+    # remove an image or a folder from the cache, it will be loaded again next time
+    asset_cache.pop(get_cache_key("image", path), None)
+    asset_cache.pop(get_cache_key("folder", path), None)
+    asset_cache.pop(get_cache_key("hidden folder", path), None)
+
+def clear_asset_cache():
+    asset_cache.clear()
+    asset_cache_stats["hits"] = 0
+    asset_cache_stats["misses"] = 0
+    text_cache.clear()
+    text_cache_stats["hits"] = 0
+    text_cache_stats["misses"] = 0
+    # the atlas will be loaded again too
+    atlas.update({"loaded": False, "images": {}, "folders": {}})
+
+def get_asset_cache_info():
+    # number of hits, misses and assets currently in the cache
+    return {"hits": asset_cache_stats["hits"], "misses": asset_cache_stats["misses"], "size": len(asset_cache)}
+
+def get_text_cache_info():
+    # number of hits, misses and texts currently in the text cache
+    return {"hits": text_cache_stats["hits"], "misses": text_cache_stats["misses"], "size": len(text_cache)}
+
+# decoding every file in a folder
+def load_folder(path):
 
     surfaces = []
     for _,__,img_files in walk(path):
         # * we do a _  then __ becuase walk returns a tuple containing the path, then a list of the names of the subfolders, and then a list of the names of the files inside the folder, which is what we care about.
-        for image in img_files:
+        # sort the files : the order given by walk depends on the system, and the frames must stay in order
+        for image in sorted(img_files):
             # create a fullpath
             full_path = path + "/" + image
-             
+
             # get the image corresponding to that path
             image_surf = pygame.image.load(full_path).convert_alpha()
 
             #add it to the surfaces
             surfaces.append(image_surf)
-    
+
     return surfaces
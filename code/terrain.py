@@ -0,0 +1,82 @@
+import pygame
+import numpy as np
+from settings import *
+from support import import_map
+
+
+class Terrain:
+    # the floor of the map, baked into chunks so that only the chunks on screen are drawn
+    # (the chunks are baked by the world when they get close to the player, and dropped when they're far)
+    def __init__(self):
+        self.display_surface = pygame.display.get_surface()
+
+        # pre-rendered floor
+        self.floor_surface = pygame.image.load(FLOOR_IMAGE).convert() if FLOOR_IMAGE else None
+
+        # tile layers : layout (from the map) and tileset
+        self.layers = []
+        for layer in floor_layers:
+            layout = import_map()[layer["layer"]]
+            tileset = pygame.image.load(layer["tileset"]).convert_alpha()
+            self.layers.append((layout, tileset))
+
+        # size of the map in pixels
+        self.width, self.height = self.floor_surface.get_size() if self.floor_surface else (0, 0)
+        for layout, _ in self.layers:
+            self.width = max(self.width, layout.shape[1] * TILESIZE)
+            self.height = max(self.height, layout.shape[0] * TILESIZE)
+
+        # number of chunks on each axis
+        self.columns = -(-self.width // CHUNK_SIZE)
+        self.rows = -(-self.height // CHUNK_SIZE)
+
+        # (column, row) -> baked surface
+        self.chunks = {}
+
+    def bake_chunk(self, column, row):
+        # it only reads the sources and returns a new surface, so it can be called from another thread
+        # area of the map covered by the chunk (smaller on the edges of the map)
+        chunk_rect = pygame.Rect(column * CHUNK_SIZE, row * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+        chunk_rect = chunk_rect.clip(pygame.Rect(0, 0, self.width, self.height))
+
+        chunk_surface = pygame.Surface(chunk_rect.size).convert()
+        chunk_surface.fill(WATER_COLOR)
+
+        # draw the part of the floor image under the chunk
+        if self.floor_surface:
+            chunk_surface.blit(self.floor_surface, (0, 0), chunk_rect)
+
+        # draw the tiles of every layer
+        for layout, tileset in self.layers:
+            tileset_columns = tileset.get_width() // TILESIZE
+            # part of the layout under the chunk
+            first_row, first_column = chunk_rect.top // TILESIZE, chunk_rect.left // TILESIZE
+            chunk_layout = layout[first_row:chunk_rect.bottom // TILESIZE, first_column:chunk_rect.right // TILESIZE]
+
+            for row_index, col_index in zip(*np.nonzero(chunk_layout != -1)):
+                # the number in the layout is the index of the tile in the tileset
+                tile_index = int(chunk_layout[row_index, col_index])
+                tile_rect = pygame.Rect((tile_index % tileset_columns) * TILESIZE,
+                                        (tile_index // tileset_columns) * TILESIZE, TILESIZE, TILESIZE)
+                position = (int(col_index) * TILESIZE, int(row_index) * TILESIZE)
+                chunk_surface.blit(tileset, position, tile_rect)
+
+        return chunk_surface
+
+    def draw(self, offset):
+        # only draw the chunks that are on screen
+        screen_width, screen_height = self.display_surface.get_size()
+        first_column = max(int(offset.x) // CHUNK_SIZE, 0)
+        last_column = min((int(offset.x) + screen_width) // CHUNK_SIZE, self.columns - 1)
+        first_row = max(int(offset.y) // CHUNK_SIZE, 0)
+        last_row = min((int(offset.y) + screen_height) // CHUNK_SIZE, self.rows - 1)
+
+        for row in range(first_row, last_row + 1):
+            for column in range(first_column, last_column + 1):
+                # bake the chunk now if it hasn't been baked yet
+                if (column, row) not in self.chunks:
+                    self.chunks[(column, row)] = self.bake_chunk(column, row)
+
+                # removing the offset from the chunk to figure out where to draw it
+                position = (column * CHUNK_SIZE - offset.x, row * CHUNK_SIZE - offset.y)
+                self.display_surface.blit(self.chunks[(column, row)], position)
@@ -5,8 +5,7 @@ from settings import *
 class Tile(pygame.sprite.Sprite):
     def __init__(self, position, groups,sprite_type, surface = pygame.Surface((TILESIZE,TILESIZE))):
 
-        # add the tile to the group it belongs
-        super().__init__(groups)
+        super().__init__()
 
         # store the type of sprite
         self.sprite_type = sprite_type
@@ -24,3 +23,6 @@ class Tile(pygame.sprite.Sprite):
 
         # get a rectangle shrinked by y pixels horizontally and x pixels vertically
         self.hitbox = self.rect.inflate(0, y_offset)
+
+        # add the tile to the group it belongs (once it has a position, some groups need it to place the tile)
+        self.add(groups)
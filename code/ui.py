@@ -1,5 +1,6 @@
 import pygame
 from settings import *
+from support import import_image, import_font, render_text
 
 
 class UI:
@@ -10,7 +11,7 @@ class UI:
         self.display_surface = pygame.display.get_surface()
 
         # use the suitable font
-        self.font = pygame.font.Font(UI_FONT, UI_FONT_SIZE)
+        self.font = import_font(UI_FONT, UI_FONT_SIZE)
 
         # * Bar setup
 
@@ -24,19 +25,38 @@ class UI:
         self.weapon_graphics = []
         for weapon in weapon_data.values():
             fullpath = weapon["graphic"]
-            weapon_image = pygame.image.load(fullpath)
+            weapon_image = import_image(fullpath)
             self.weapon_graphics.append(weapon_image)
 
         # convert the graphics of weapon data dictionnary as a list of images
         self.magic_graphics = []
         for magic in magic_data.values():
             fullpath = magic["graphic"]
-            magic_image = pygame.image.load(fullpath)
+            magic_image = import_image(fullpath)
             self.magic_graphics.append(magic_image)
 
-    def show_bar(self, current_amount, max_amount, background_rect, color):
+        # * Widgets
+        # every part of the ui is rendered on its own surface, and rendered again only when it changes :
+        # name -> (what it shows, surface, position)
+        self.widgets = {}
+        # (surface, position) of every widget, drawn in one call
+        self.blit_sequence = None
+
+    def update_widget(self, name, key, render, **position):
+        # render a widget again only when what it shows (the key) has changed
+        # position : where the widget is placed, eg : topleft=(10, 10)
+        widget = self.widgets.get(name)
+        if widget is None or widget[0] != key:
+            widget_surf = render()
+            self.widgets[name] = (key, widget_surf, widget_surf.get_rect(**position).topleft)
+            # the widgets to draw have changed
+            self.blit_sequence = None
+
+    def render_bar(self, current_amount, max_amount, size, color):
         # draw the background of the bar
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, background_rect)
+        bar_surf = pygame.Surface(size).convert()
+        background_rect = bar_surf.get_rect()
+        bar_surf.fill(UI_BG_COLOR)
 
         # converting stat to pixel
 
@@ -51,80 +71,82 @@ class UI:
         current_rect.width = current_width
 
         # draw the bar
-        pygame.draw.rect(self.display_surface, color, current_rect)
+        pygame.draw.rect(bar_surf, color, current_rect)
 
         # add a border around the bar
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, background_rect, 3)
+        pygame.draw.rect(bar_surf, UI_BORDER_COLOR, background_rect, 3)
+        return bar_surf
 
-    def show_exp(self, exp):
-        # get the exp as a text and display it 
-        text_surf = self.font.render("EXP : " + str(int(exp)), False, TEXT_COLOR)
-
-        # get the position where we'll display
-        x = self.display_surface.get_size()[0] - 20
-        y = self.display_surface.get_size()[1] - 20
-        text_rect = text_surf.get_rect(bottomright=(x, y))
+    def show_bar(self, name, current_amount, max_amount, background_rect, color):
+        # the bar only changes when its width in pixels changes (not for every point of energy recovered)
+        current_rect = background_rect.copy()
+        current_rect.width = background_rect.width * current_amount / max_amount
+        self.update_widget(name, current_rect.width,
+                           lambda: self.render_bar(current_amount, max_amount, background_rect.size, color),
+                           topleft=background_rect.topleft)
 
-        # add a background
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, text_rect.inflate(20, 20))
+    def render_exp(self, exp):
+        # get the exp as a text
+        text_surf = render_text(self.font, "EXP : " + str(int(exp)), TEXT_COLOR)
 
-        # add the border of the background
-        pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, text_rect.inflate(20, 20), 3)
+        # add a background with a border around the text
+        exp_surf = pygame.Surface(text_surf.get_rect().inflate(20, 20).size).convert()
+        background_rect = exp_surf.get_rect()
+        exp_surf.fill(UI_BG_COLOR)
+        pygame.draw.rect(exp_surf, UI_BORDER_COLOR, background_rect, 3)
 
         # display the text
-        self.display_surface.blit(text_surf, text_rect)
+        exp_surf.blit(text_surf, text_surf.get_rect(center=background_rect.center))
+        return exp_surf
 
-    def selection_box(self, left, top, has_switched):
-        # display the box which will contain an item(weapon / magic) 
+    def show_exp(self, exp):
+        # get the position where we'll display (bottom right of the screen)
+        x = self.display_surface.get_size()[0] - 10
+        y = self.display_surface.get_size()[1] - 10
+        self.update_widget("exp", int(exp), lambda: self.render_exp(exp), bottomright=(x, y))
 
-        # get the rect
-        background_rect = pygame.Rect(left, top, ITEM_BOX_SIZE, ITEM_BOX_SIZE)
+    def render_selection_box(self, item_surf, has_switched):
+        # display the box which will contain an item(weapon / magic)
+        box_surf = pygame.Surface((ITEM_BOX_SIZE, ITEM_BOX_SIZE)).convert()
+        background_rect = box_surf.get_rect()
 
         # display the background
-        pygame.draw.rect(self.display_surface, UI_BG_COLOR, background_rect)
+        box_surf.fill(UI_BG_COLOR)
 
         # add a border
         if has_switched:
-            pygame.draw.rect(self.display_surface, UI_BORDER_COLOR_ACTIVE, background_rect, 3)
+            pygame.draw.rect(box_surf, UI_BORDER_COLOR_ACTIVE, background_rect, 3)
         else:
-            pygame.draw.rect(self.display_surface, UI_BORDER_COLOR, background_rect, 3)
+            pygame.draw.rect(box_surf, UI_BORDER_COLOR, background_rect, 3)
 
-        # return the rect for later use for the weapon/magic
-        return background_rect
+        # display the item in the middle of the box
+        box_surf.blit(item_surf, item_surf.get_rect(center=background_rect.center))
+        return box_surf
 
     def weapon_overlay(self, weapon_index, has_switched):
-        # display the weapon box
-        background_rect = self.selection_box(10, 630, has_switched)
-
-        # get the surface as the current selected weapon 
-        weapon_surf = self.weapon_graphics[weapon_index]
-
-        # get the rectangle 
-        weapon_rect = weapon_surf.get_rect(center=background_rect.center)
-
-        # display the weapon
-        self.display_surface.blit(weapon_surf, weapon_rect)
+        # display the weapon box with the current selected weapon
+        self.update_widget("weapon", (weapon_index, has_switched),
+                           lambda: self.render_selection_box(self.weapon_graphics[weapon_index], has_switched),
+                           topleft=(10, 630))
 
     def magic_overlay(self, magic_index, has_switched):
-        # display the weapon box
-        background_rect = self.selection_box(80, 635, has_switched)
-
-        # get the surface as the current selected magic
-        magic_surf = self.magic_graphics[magic_index]
-
-        # get the rectangle
-        magic_rect = magic_surf.get_rect(center=background_rect.center)
-
-        # display the magic
-        self.display_surface.blit(magic_surf, magic_rect)
+        # display the magic box with the current selected magic
+        self.update_widget("magic", (magic_index, has_switched),
+                           lambda: self.render_selection_box(self.magic_graphics[magic_index], has_switched),
+                           topleft=(80, 635))
 
     def display(self, player):
         # display both bars
-        self.show_bar(player.health, player.stats["health"], self.health_bar_rect, HEALTH_COLOR)
-        self.show_bar(player.energy, player.stats["energy"], self.energy_bar_rect, ENERGY_COLOR)
+        self.show_bar("health", player.health, player.stats["health"], self.health_bar_rect, HEALTH_COLOR)
+        self.show_bar("energy", player.energy, player.stats["energy"], self.energy_bar_rect, ENERGY_COLOR)
 
         # display exp
         self.show_exp(player.exp)
 
         self.weapon_overlay(player.weapon_index, not player.can_switch_weapon)
         self.magic_overlay(player.magic_index, not player.can_switch_magic)
+
+        # draw every widget in one call (the list is only made again when a widget has changed)
+        if self.blit_sequence is None:
+            self.blit_sequence = [(surface, position) for _, surface, position in self.widgets.values()]
+        self.display_surface.blits(self.blit_sequence, doreturn=False)
@@ -1,5 +1,6 @@
 import pygame
 from settings import *
+from support import import_font, render_text
 
 
 class Upgrade:
@@ -11,7 +12,7 @@ class Upgrade:
         self.attribute_number = len(player.stats)
         self.attribute_names = list(player.stats.keys())
         self.max_values = list(player.max_stats.values())
-        self.font = pygame.font.Font(UI_FONT, UI_FONT_SIZE)
+        self.font = import_font(UI_FONT, UI_FONT_SIZE)
 
         # selection system
         self.selection_index = self.attribute_number // 2
@@ -24,6 +25,8 @@ class Upgrade:
         self.height = self.display_surface.get_size()[1] * 0.8
         self.width = self.display_surface.get_size()[0] // (self.attribute_number + 1)
         self.create_items()
+        # what every item showed the last time it was drawn (it's drawn again only when it changes)
+        self.item_states = [None] * self.attribute_number
 
 
     def input(self):
@@ -70,10 +73,13 @@ class Upgrade:
             item = Item(left, top, self.width, self.height, index, self.font)
             self.item_list.append(item)
 
-    def display(self):
+    def display(self, redraw=False):
+        # draw the items that have changed (every item if redraw is True, when the screen behind has been drawn)
+        # and return the rectangles of the screen that have been drawn
         self.input()
         self.selection_cooldown()
 
+        dirty_rects = []
         for index, item in enumerate(self.item_list):
             # get attributes
             name = self.attribute_names[index]
@@ -81,7 +87,13 @@ class Upgrade:
             max_value = self.max_values[index]
             cost = self.player.get_cost_by_index(index)
 
-            item.display(self.display_surface, self.selection_index, name, value, max_value, cost)
+            # the item covers its whole rectangle, so it can be drawn over the last frame
+            state = (self.selection_index == index, name, value, max_value, cost)
+            if redraw or state != self.item_states[index]:
+                item.display(self.display_surface, self.selection_index, name, value, max_value, cost)
+                self.item_states[index] = state
+                dirty_rects.append(item.rect)
+        return dirty_rects
 
 
 # boxes of the upgrade class
@@ -95,13 +107,13 @@ class Item:
         # use the suitable color
         color = TEXT_COLOR_SELECTED if selected else TEXT_COLOR
 
-        # title text
-        title_surf = self.font.render(name, False, color)
+        # title text (the texts are rendered once and kept in the text cache)
+        title_surf = render_text(self.font, name, color)
         # place the rectangle on the top
         title_rect = title_surf.get_rect(midtop=self.rect.midtop + pygame.math.Vector2(0,20))
 
         # cost text
-        cost_surf = self.font.render("Cost : " + str(int(cost)), False, color)
+        cost_surf = render_text(self.font, "Cost : " + str(int(cost)), color)
         cost_rect = cost_surf.get_rect(midbottom=self.rect.midbottom + pygame.math.Vector2(0,-20))
 
         # draw everything
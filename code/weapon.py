@@ -1,4 +1,17 @@
 import pygame
+from settings import *
+from support import import_image
+
+# weapon name -> direction -> surface, filled once by import_weapon_graphics
+weapon_graphics = {}
+
+
+def import_weapon_graphics():
+    # load every weapon in every direction before playing, so that attacking never loads an image
+    for weapon in weapon_data.keys():
+        weapon_graphics[weapon] = {}
+        for direction in ("up", "down", "left", "right"):
+            weapon_graphics[weapon][direction] = import_image(f"../graphics/weapons/{weapon}/{direction}.png")
 
 
 class Weapon(pygame.sprite.Sprite):
@@ -11,9 +24,7 @@ class Weapon(pygame.sprite.Sprite):
         # * GRAPHICS    
 
         # sprite of the weapon, depending on where the player is facing
-
-        full_path = f"../graphics/weapons/{player.weapon}/{direction}.png"
-        self.image = pygame.image.load(full_path).convert_alpha()
+        self.image = weapon_graphics[player.weapon][direction]
 
         # * PLACEMENT
 
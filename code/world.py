@@ -0,0 +1,161 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from settings import *
+
+
+class World:
+    # streams the map around the player : the grass, objects and enemies only exist in the chunks close to the player
+    # the far chunks are unloaded (their state is kept) and loaded again when the player comes back
+    def __init__(self, game_map, terrain, create_grass, create_object, create_enemy):
+        # layers of the map that contain sprites
+        self.layouts = {"grass": game_map["grass"], "object": game_map["object"], "entity": game_map["entity"]}
+        self.terrain = terrain
+
+        # functions from the level that create the sprites
+        self.create_grass = create_grass
+        self.create_object = create_object
+        self.create_enemy = create_enemy
+
+        # number of tiles on each side of a chunk, and number of chunks on each axis
+        self.chunk_tiles = CHUNK_SIZE // TILESIZE
+        rows, columns = self.layouts["grass"].shape
+        self.columns = -(-columns // self.chunk_tiles)
+        self.rows = -(-rows // self.chunk_tiles)
+
+        # (column, row) of the chunk -> list of (cell, sprite) created for it
+        self.loaded_chunks = {}
+        # (column, row) of the chunk -> chunk being prepared on the background thread
+        self.pending_chunks = {}
+        # the chunks are prepared (read from the map, floor baked) on a background thread,
+        # the sprites are only created by the main thread
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+        # * state of the unloaded chunks
+        # cells of the grass that has been destroyed
+        self.destroyed_grass = set()
+        # image of every grass that has been created (so it looks the same when it's loaded again)
+        self.grass_images = {}
+        # cells of the enemies of the map that have already been created (they're saved or alive from now on)
+        self.spawned_enemies = set()
+        # chunk -> enemies saved when their chunk was unloaded (cell, number in the map, position, health)
+        self.saved_enemies = {}
+        # enemy -> cell where it has been created and its number in the map
+        self.live_enemies = {}
+
+    def close(self):
+        # stop the background thread (when the level is thrown away), the chunks not started yet are dropped
+        self.executor.shutdown(cancel_futures=True)
+        self.pending_chunks.clear()
+
+    def get_chunk(self, position):
+        return int(position[0]) // CHUNK_SIZE, int(position[1]) // CHUNK_SIZE
+
+    def get_chunks_around(self, position, radius):
+        # every chunk of the map in a square of radius chunks around the position
+        center_column, center_row = self.get_chunk(position)
+        return {(column, row)
+                for row in range(max(center_row - radius, 0), min(center_row + radius, self.rows - 1) + 1)
+                for column in range(max(center_column - radius, 0), min(center_column + radius, self.columns - 1) + 1)}
+
+    def is_far(self, chunk, position, radius):
+        center_column, center_row = self.get_chunk(position)
+        return max(abs(chunk[0] - center_column), abs(chunk[1] - center_row)) > radius
+
+    def prepare_chunk(self, chunk):
+        # runs on the background thread : get the non empty cells of the chunk and bake its floor
+        column, row = chunk
+        first_row, first_column = row * self.chunk_tiles, column * self.chunk_tiles
+
+        spawns = []
+        for style, layout in self.layouts.items():
+            chunk_layout = layout[first_row:first_row + self.chunk_tiles, first_column:first_column + self.chunk_tiles]
+            for row_index, col_index in zip(*np.nonzero(chunk_layout != -1)):
+                cell = (first_row + int(row_index), first_column + int(col_index))
+                spawns.append((style, cell, int(chunk_layout[row_index, col_index])))
+
+        return spawns, self.terrain.bake_chunk(column, row)
+
+    def load_chunk(self, chunk, spawns, floor_surface):
+        # runs on the main thread : create the sprites of the chunk
+        self.terrain.chunks[chunk] = floor_surface
+
+        sprites = []
+        for style, (row_index, col_index), value in spawns:
+            position = (col_index * TILESIZE, row_index * TILESIZE)
+
+            if style == "grass" and (row_index, col_index) not in self.destroyed_grass:
+                sprite = self.create_grass(position, self.grass_images.get((row_index, col_index)))
+                self.grass_images[(row_index, col_index)] = sprite.image
+                sprites.append(((row_index, col_index), sprite))
+
+            if style == "object":
+                sprites.append(((row_index, col_index), self.create_object(position, value)))
+
+            # the enemies of the map are only created once, then they're saved with their chunk
+            # (the player is created by the level)
+            if style == "entity" and value != 394 and (row_index, col_index) not in self.spawned_enemies:
+                self.spawned_enemies.add((row_index, col_index))
+                enemy = self.create_enemy(value, position)
+                self.live_enemies[enemy] = ((row_index, col_index), value)
+
+        # enemies that were saved in this chunk
+        for cell, value, position, health in self.saved_enemies.pop(chunk, []):
+            enemy = self.create_enemy(value, position, health)
+            self.live_enemies[enemy] = (cell, value)
+
+        self.loaded_chunks[chunk] = sprites
+
+    def unload_chunk(self, chunk):
+        for cell, sprite in self.loaded_chunks.pop(chunk):
+            if sprite.alive():
+                sprite.kill()
+            else:
+                # the sprite has been destroyed while the chunk was loaded (the grass)
+                self.destroyed_grass.add(cell)
+
+        self.terrain.chunks.pop(chunk, None)
+
+    def save_far_enemies(self, position):
+        # an enemy is saved in the chunk where it is (not where it was created)
+        for enemy, (cell, value) in list(self.live_enemies.items()):
+            if not enemy.alive():
+                # killed by the player : it won't come back
+                del self.live_enemies[enemy]
+                continue
+
+            chunk = self.get_chunk(enemy.rect.center)
+            if self.is_far(chunk, position, UNLOAD_RADIUS):
+                self.saved_enemies.setdefault(chunk, []).append((cell, value, enemy.rect.topleft, enemy.health))
+                enemy.kill()
+                del self.live_enemies[enemy]
+
+    def load_around(self, position):
+        # load every chunk close to the position right away (when the level starts)
+        for chunk in self.get_chunks_around(position, STREAM_RADIUS):
+            if chunk not in self.loaded_chunks:
+                self.load_chunk(chunk, *self.prepare_chunk(chunk))
+
+    def update(self, player):
+        position = player.rect.center
+
+        # create the sprites of the chunks that are ready
+        for chunk, future in list(self.pending_chunks.items()):
+            if future.done():
+                del self.pending_chunks[chunk]
+                # (the chunk may have been loaded right away by load_around while it was prepared)
+                if chunk in self.loaded_chunks:
+                    continue
+                if not self.is_far(chunk, position, UNLOAD_RADIUS):
+                    self.load_chunk(chunk, *future.result())
+
+        # prepare the chunks that are getting close
+        for chunk in self.get_chunks_around(position, STREAM_RADIUS):
+            if chunk not in self.loaded_chunks and chunk not in self.pending_chunks:
+                self.pending_chunks[chunk] = self.executor.submit(self.prepare_chunk, chunk)
+
+        # unload the chunks that are far enough (further than the loading radius, so that
+        # walking on the border of a chunk doesn't load and unload it every frame)
+        for chunk in list(self.loaded_chunks.keys()):
+            if self.is_far(chunk, position, UNLOAD_RADIUS):
+                self.unload_chunk(chunk)
+        self.save_far_enemies(position)